@@ -1,24 +1,66 @@
 import sqlite3
-import json
+import threading
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import logging
 
+import msgpack
+import orjson
+
 logger = logging.getLogger(__name__)
 
 class Database:
-    """SQLite database handler for bot data"""
-    
+    """SQLite database handler for bot data
+
+    The API is synchronous by design: async callers run it through
+    asyncio.to_thread, which keeps the event loop free without an
+    aiosqlite port, and the single WAL-mode connection keeps SQLite's
+    page cache hot across calls.
+    """
+
     def __init__(self, db_path: str = "pptlinks_bot.db"):
         self.db_path = db_path
+        # Single long-lived connection - opening a fresh connection per call
+        # throws away SQLite's page cache and pays file-open overhead every time.
+        # check_same_thread=False because APScheduler/PTB may call from different
+        # threads; the lock serializes access.
+        self._lock = threading.Lock()
+        # Notifications are buffered and flushed in one transaction instead of
+        # paying an INSERT+fsync per notification in the Monitor send loops
+        self._pending_notifs: list = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._configure_connection()
         self.init_database()
-    
+
+    def _configure_connection(self):
+        """Apply performance PRAGMAs once for the lifetime of the connection"""
+        try:
+            cursor = self._conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-64000")
+        except Exception as e:
+            logger.error(f"Error configuring database connection: {e}")
+
+    def close(self):
+        """Close the database connection (call on bot shutdown)"""
+        try:
+            self.flush_notifications()
+            with self._lock:
+                self._conn.close()
+                logger.info("Database connection closed")
+        except Exception as e:
+            logger.error(f"Error closing database: {e}")
+
     def init_database(self):
         """Initialize database tables"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
-                # Users table
+                # Users table - WITHOUT ROWID since it's only ever accessed by
+                # its primary key, so one B-tree holds both key and data
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS users (
                         chat_id INTEGER PRIMARY KEY,
@@ -26,19 +68,21 @@ class Database:
                         first_name TEXT,
                         last_name TEXT,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
+                    ) WITHOUT ROWID
                 """)
-                
-                # Courses table
+
+                # Courses table - same PK-only access pattern as users
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS courses (
                         course_id TEXT PRIMARY KEY,
                         course_name TEXT,
-                        course_data TEXT,
+                        course_data BLOB,
                         data_hash TEXT,
                         last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
+                    ) WITHOUT ROWID
                 """)
+
+                self._migrate_rowid_tables(cursor)
                 
                 # User-Course subscriptions table
                 cursor.execute("""
@@ -65,25 +109,93 @@ class Database:
                         sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
-                
-                conn.commit()
+
+                # Indexes for the hot lookup paths - subscription checks and
+                # stats queries filter on these columns every poll cycle
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_uc_chat_active
+                    ON user_courses(chat_id, active)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_uc_course_active
+                    ON user_courses(course_id, active)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_notif_chat
+                    ON notifications(chat_id, sent_at)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_notif_sent
+                    ON notifications(sent_at)
+                """)
+
                 logger.info("Database initialized successfully")
                 
         except Exception as e:
             logger.error(f"Database initialization error: {e}")
+
+    @staticmethod
+    def _decode_course_data(raw) -> dict:
+        """Decode a stored course payload
+
+        New rows are MessagePack BLOBs; rows written by older versions are
+        JSON text, so fall back on str input.
+        """
+        if isinstance(raw, bytes):
+            return msgpack.unpackb(raw)
+        return orjson.loads(raw)
+
+    def _migrate_rowid_tables(self, cursor):
+        """Rebuild users/courses as WITHOUT ROWID if created by an older version"""
+        rebuilds = {
+            'users': """
+                CREATE TABLE new_users (
+                    chat_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                ) WITHOUT ROWID
+            """,
+            'courses': """
+                CREATE TABLE new_courses (
+                    course_id TEXT PRIMARY KEY,
+                    course_name TEXT,
+                    course_data BLOB,
+                    data_hash TEXT,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                ) WITHOUT ROWID
+            """,
+        }
+        for table, create_sql in rebuilds.items():
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)
+            )
+            row = cursor.fetchone()
+            if row and 'WITHOUT ROWID' not in row[0].upper():
+                logger.info(f"Migrating {table} table to WITHOUT ROWID layout")
+                cursor.execute("BEGIN")
+                try:
+                    cursor.execute(create_sql)
+                    cursor.execute(f"INSERT INTO new_{table} SELECT * FROM {table}")
+                    cursor.execute(f"DROP TABLE {table}")
+                    cursor.execute(f"ALTER TABLE new_{table} RENAME TO {table}")
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
     
     def add_user(self, chat_id: int, username: str = None, 
                  first_name: str = None, last_name: str = None):
         """Add or update user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO users 
                     (chat_id, username, first_name, last_name)
                     VALUES (?, ?, ?, ?)
                 """, (chat_id, username, first_name, last_name))
-                conn.commit()
         except Exception as e:
             logger.error(f"Error adding user: {e}")
     
@@ -95,8 +207,8 @@ class Database:
             False if user was already subscribed (active=1)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
 
                 # Check if subscription exists
                 cursor.execute("""
@@ -112,7 +224,6 @@ class Database:
                         INSERT INTO user_courses (chat_id, course_id, active)
                         VALUES (?, ?, 1)
                     """, (chat_id, course_id))
-                    conn.commit()
                     logger.info(f"New subscription created: user {chat_id}, course {course_id}")
                     return True
                 elif row[0] == 0:
@@ -122,7 +233,6 @@ class Database:
                         SET active = 1, subscribed_at = CURRENT_TIMESTAMP
                         WHERE chat_id = ? AND course_id = ?
                     """, (chat_id, course_id))
-                    conn.commit()
                     logger.info(f"Reactivated subscription: user {chat_id}, course {course_id}")
                     return True
                 else:
@@ -137,8 +247,8 @@ class Database:
     def unsubscribe_user_from_course(self, chat_id: int, course_id: str = None):
         """Unsubscribe user from a course or all courses"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 if course_id:
                     cursor.execute("""
                         UPDATE user_courses 
@@ -152,15 +262,14 @@ class Database:
                         SET active = 0 
                         WHERE chat_id = ?
                     """, (chat_id,))
-                conn.commit()
         except Exception as e:
             logger.error(f"Error unsubscribing user: {e}")
     
     def get_user_courses(self, chat_id: int) -> List[str]:
         """Get all courses a user is subscribed to"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     SELECT course_id FROM user_courses
                     WHERE chat_id = ? AND active = 1
@@ -170,11 +279,29 @@ class Database:
             logger.error(f"Error getting user courses: {e}")
             return []
     
+    def user_has_any_course(self, chat_id: int) -> bool:
+        """Check whether a user has at least one active subscription
+
+        LIMIT 1 stops at the first matching index entry instead of
+        materializing the user's whole course list just to test emptiness.
+        """
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute("""
+                    SELECT 1 FROM user_courses
+                    WHERE chat_id = ? AND active = 1 LIMIT 1
+                """, (chat_id,))
+                return cursor.fetchone() is not None
+        except Exception as e:
+            logger.error(f"Error checking user courses: {e}")
+            return False
+
     def get_course_subscribers(self, course_id: str) -> List[int]:
         """Get all users subscribed to a course"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     SELECT chat_id FROM user_courses
                     WHERE course_id = ? AND active = 1
@@ -188,22 +315,21 @@ class Database:
                          course_data: dict, data_hash: str):
         """Save or update course data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO courses 
                     (course_id, course_name, course_data, data_hash, last_updated)
                     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (course_id, course_name, json.dumps(course_data), data_hash))
-                conn.commit()
+                """, (course_id, course_name, msgpack.packb(course_data), data_hash))
         except Exception as e:
             logger.error(f"Error saving course data: {e}")
     
     def get_course_data(self, course_id: str) -> Optional[Dict]:
         """Get cached course data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     SELECT course_data, data_hash FROM courses
                     WHERE course_id = ?
@@ -211,33 +337,77 @@ class Database:
                 row = cursor.fetchone()
                 if row:
                     return {
-                        'data': json.loads(row[0]),
+                        'data': self._decode_course_data(row[0]),
                         'hash': row[1]
                     }
         except Exception as e:
             logger.error(f"Error getting course data: {e}")
         return None
-    
-    def log_notification(self, chat_id: int, course_id: str, 
+
+    def get_course_names_bulk(self, course_ids: List[str]) -> Dict[str, str]:
+        """Get course names for many courses in one query
+
+        The course list views only need names, so this reads the course_name
+        column directly - one round trip, no payload decode.
+        """
+        if not course_ids:
+            return {}
+        try:
+            names: Dict[str, str] = {}
+            with self._lock:
+                cursor = self._conn.cursor()
+                # Chunk to stay under SQLite's ~999 bound-parameter limit
+                for i in range(0, len(course_ids), 900):
+                    batch = tuple(course_ids[i:i + 900])
+                    placeholders = ','.join('?' * len(batch))
+                    cursor.execute(f"""
+                        SELECT course_id, course_name FROM courses
+                        WHERE course_id IN ({placeholders})
+                    """, batch)
+                    names.update(cursor.fetchall())
+            return names
+        except Exception as e:
+            logger.error(f"Error getting course names in bulk: {e}")
+            return {}
+
+    def log_notification(self, chat_id: int, course_id: str,
                         notification_type: str, content: str):
-        """Log sent notification"""
+        """Buffer a sent notification for batched insertion"""
+        with self._lock:
+            self._pending_notifs.append((chat_id, course_id, notification_type, content))
+            should_flush = len(self._pending_notifs) >= 64
+        if should_flush:
+            self.flush_notifications()
+
+    def flush_notifications(self):
+        """Write all buffered notifications in a single transaction"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO notifications 
-                    (chat_id, course_id, notification_type, content)
-                    VALUES (?, ?, ?, ?)
-                """, (chat_id, course_id, notification_type, content))
-                conn.commit()
+            with self._lock:
+                if not self._pending_notifs:
+                    return
+                pending, self._pending_notifs = self._pending_notifs, []
+                cursor = self._conn.cursor()
+                cursor.execute("BEGIN")
+                try:
+                    cursor.executemany("""
+                        INSERT INTO notifications
+                        (chat_id, course_id, notification_type, content)
+                        VALUES (?, ?, ?, ?)
+                    """, pending)
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
         except Exception as e:
-            logger.error(f"Error logging notification: {e}")
+            logger.error(f"Error flushing notifications: {e}")
     
     def get_user_stats(self, chat_id: int) -> Dict:
         """Get user statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            # Make sure buffered notifications are counted
+            self.flush_notifications()
+            with self._lock:
+                cursor = self._conn.cursor()
                 
                 # Total courses
                 cursor.execute("""
@@ -264,23 +434,37 @@ class Database:
     def cleanup_old_notifications(self, days: int = 30):
         """Delete old notification logs"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    DELETE FROM notifications
-                    WHERE sent_at < datetime('now', '-' || ? || ' days')
-                """, (days,))
-                deleted = cursor.rowcount
-                conn.commit()
-                logger.info(f"Cleaned up {deleted} old notifications")
+            # Precompute the cutoff so SQLite compares against a constant and
+            # can range-scan the sent_at index instead of evaluating datetime()
+            # per row (sent_at defaults to CURRENT_TIMESTAMP, which is UTC)
+            cutoff = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+            deleted = 0
+            # Delete in bounded batches so a huge backlog doesn't hold the
+            # write lock for minutes or balloon the WAL
+            while True:
+                with self._lock:
+                    cursor = self._conn.cursor()
+                    cursor.execute("""
+                        DELETE FROM notifications
+                        WHERE id IN (
+                            SELECT id FROM notifications
+                            WHERE sent_at < ?
+                            LIMIT 10000
+                        )
+                    """, (cutoff,))
+                    batch = cursor.rowcount
+                deleted += batch
+                if batch < 10000:
+                    break
+            logger.info(f"Cleaned up {deleted} old notifications")
         except Exception as e:
             logger.error(f"Error cleaning up notifications: {e}")
     
     def get_all_active_subscriptions(self) -> List[tuple]:
         """Get all active user-course pairs for monitoring"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     SELECT chat_id, course_id FROM user_courses
                     WHERE active = 1
@@ -290,11 +474,40 @@ class Database:
             logger.error(f"Error getting active subscriptions: {e}")
             return []
 
+    def get_all_active_subscriptions_with_data(self) -> List[tuple]:
+        """Get all active subscriptions joined with cached course data
+
+        Returns (chat_id, course_id, course_data_dict_or_None) tuples in a
+        single query so startup restore doesn't hit the DB once per user.
+        """
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute("""
+                    SELECT uc.chat_id, uc.course_id, c.course_data
+                    FROM user_courses uc
+                    LEFT JOIN courses c ON uc.course_id = c.course_id
+                    WHERE uc.active = 1
+                """)
+                rows = cursor.fetchall()
+            # Decode each course payload once even if many users share it -
+            # subscribers of the same course get the same dict object
+            decoded: Dict[str, Optional[dict]] = {}
+            result = []
+            for chat_id, course_id, data in rows:
+                if course_id not in decoded:
+                    decoded[course_id] = self._decode_course_data(data) if data else None
+                result.append((chat_id, course_id, decoded[course_id]))
+            return result
+        except Exception as e:
+            logger.error(f"Error getting active subscriptions with data: {e}")
+            return []
+
     def get_subscription_date(self, chat_id: int, course_id: str) -> Optional[str]:
         """Get subscription date for a user-course pair"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._conn.cursor()
                 cursor.execute("""
                     SELECT subscribed_at FROM user_courses
                     WHERE chat_id = ? AND course_id = ? AND active = 1
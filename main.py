@@ -1,11 +1,30 @@
 # main.py - Enhanced PPTLinks Telegram Bot
+import atexit
 import os
-import json
+import sys
+import functools
 import hashlib
 import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import chain
 from typing import Optional
+from zoneinfo import ZoneInfo
 import asyncio
+import httpx
+
+# uvloop drops per-task event-loop overhead for the small I/O coroutines
+# this bot is made of; fall back to the stdlib loop where it's unavailable
+# (e.g. Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application,
@@ -14,38 +33,60 @@ from telegram.ext import (
     CallbackQueryHandler,
 )
 from telegram.constants import ParseMode
+from telegram.error import RetryAfter
 from telegram.request import HTTPXRequest
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import orjson
 from dateutil import parser as date_parser
-import pytz
 from database import Database
 
 # ================================
 # CONFIG
 # ================================
-BOT_TOKEN = "8126336145:AAH9ROvECWEA1Bo1J_xclwrYA0lYdhWiMNA"
+BOT_TOKEN = os.environ.get("BOT_TOKEN", "")
 API_BASE = "https://api.pptlinks.com/api/v1"
 POLL_INTERVAL = 600  # 10 minutes
+FETCH_CACHE_TTL = 300  # seconds a fetched course payload stays fresh
+
+# Stdlib zoneinfo: one shared tzinfo object, no pytz localize() dance
+LAGOS_TZ = ZoneInfo('Africa/Lagos')
+
+# Bound .format methods for the PPTLinks deep links built on every
+# notification - the template is parsed once here instead of per f-string
+COURSE_URL = "https://pptlinks.com/course/{cid}".format
+CONTENT_URL = "https://pptlinks.com/course/{cid}/content/{iid}".format
 
 # ================================
 # LOGGING
 # ================================
+# Log records are handed to a background thread via a queue so the event
+# loop never blocks on file/console writes; hot-path logger calls become a
+# lock-free enqueue.
+_log_queue = queue.SimpleQueue()
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO,
-    handlers=[logging.FileHandler('bot.log'), logging.StreamHandler()]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener = QueueListener(
+    _log_queue, logging.FileHandler('bot.log'), logging.StreamHandler(),
+    respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # ================================
 # GLOBALS
 # ================================
 db = Database()
-scheduler = AsyncIOScheduler()
+# Jobs live in APScheduler's in-memory store (no per-add_job I/O) and are
+# rebuilt from SQLite subscriptions on startup, so nothing needs persisting.
+# Coalescing collapses piled-up firings after a stall into a single run.
+scheduler = AsyncIOScheduler(
+    job_defaults={'coalesce': True, 'misfire_grace_time': 3600, 'max_instances': 1}
+)
 
 # ================================
 # EMOJIS
@@ -80,479 +121,717 @@ class Emoji:
     HOURGLASS = "⏳"
 
 
+# Per-notification message builders run on every event, so bind the emojis
+# they interpolate to module-level names - a plain global load is cheaper
+# than a global-plus-attribute pair per interpolation
+_HR = "━" * 23  # divider shared by every message template
+_ROCKET = Emoji.ROCKET
+_BOOK = Emoji.BOOK
+_BELL = Emoji.BELL
+_CHECK = Emoji.CHECK
+_FIRE = Emoji.FIRE
+_STAR = Emoji.STAR
+_TARGET = Emoji.TARGET
+_CHART = Emoji.CHART
+_CLOCK = Emoji.CLOCK
+_CALENDAR = Emoji.CALENDAR
+_FILE = Emoji.FILE
+_VIDEO = Emoji.VIDEO
+_QUIZ = Emoji.QUIZ
+_WARNING = Emoji.WARNING
+_SPARKLES = Emoji.SPARKLES
+_PARTY = Emoji.PARTY
+_BRAIN = Emoji.BRAIN
+_LIGHT = Emoji.LIGHT
+_HOURGLASS = Emoji.HOURGLASS
+_TEACHER = Emoji.TEACHER
+_STUDENT = Emoji.STUDENT
+_TROPHY = Emoji.TROPHY
+_PIN = Emoji.PIN
+_INFO = Emoji.INFO
+
+
 # ================================
 # API
 # ================================
+# Async client plus per-course coalescing: every subscriber of a course polls
+# the same URL, so concurrent checks share one in-flight request
+# (single-flight) and a short TTL cache collapses N polls per interval into
+# a single HTTP call. Together with the one-poll-job-per-course scheduling,
+# K subscribers of a course cost exactly one fetch and one diff per cycle.
+# The client lives for the process, so keep-alive connections are reused
+# across polls instead of paying a TCP+TLS handshake per request.
+_async_client: Optional[httpx.AsyncClient] = None
+_fetch_cache: dict = {}    # course_id -> (monotonic_time, data)
+_inflight: dict = {}       # course_id -> asyncio.Future
+_etags: dict = {}          # course_id -> (etag, last_payload) for 304 revalidation
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        # Bounded keep-alive pool: reconnecting to api.pptlinks.com every
+        # poll would pay a TCP+TLS handshake per course; keeping a few warm
+        # connections amortizes that away. Connect gets its own shorter
+        # timeout so a dead host fails fast instead of eating the full 30s.
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30, connect=10),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10,
+                                keepalive_expiry=60),
+        )
+    return _async_client
+
+
+# Content hashing runs on every poll; blake3 is SIMD-accelerated and several
+# times faster than the stdlib hashes. Fall back to blake2b where the blake3
+# wheel isn't available. Chunks are streamed into the hasher so callers never
+# have to join the whole fingerprint into one big intermediate string.
+try:
+    from blake3 import blake3 as _blake3
+
+    def _content_digest(chunks) -> str:
+        h = _blake3()
+        for chunk in chunks:
+            h.update(chunk)
+        return h.hexdigest(length=16)
+except ImportError:
+    def _content_digest(chunks) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for chunk in chunks:
+            h.update(chunk)
+        return h.hexdigest()
+
+
+# Semantic fingerprint of one content item - only the fields notifications
+# react to, so cosmetic churn in the upstream JSON never looks like a change
+_ContentFingerprint = namedtuple('_ContentFingerprint', (
+    'name', 'type', 'status', 'presentation_status',
+    'quiz_status', 'quiz_start', 'quiz_end', 'quiz_duration', 'file',
+))
+
+
 class PPTLinksAPI:
     @staticmethod
-    def fetch_course_data(course_id: str) -> Optional[dict]:
-        """Fetch course data for a specific course ID
+    async def fetch_course_data_async(course_id: str) -> Optional[dict]:
+        """Fetch course data without blocking the event loop
 
-        Args:
-            course_id: The PPTLinks course ID (required)
+        Concurrent callers for the same course share one in-flight request,
+        and successful responses are cached for FETCH_CACHE_TTL seconds so
+        N subscribers polling the same course cost one HTTP call.
         """
-        url = f"{API_BASE}/course/user-courses/{course_id}?brief=false&timeZone=Africa/Lagos"
-        session = requests.Session()
-        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        session.mount('https://', HTTPAdapter(max_retries=retry))
+        cached = _fetch_cache.get(course_id)
+        if cached and time.monotonic() - cached[0] < FETCH_CACHE_TTL:
+            logger.debug("Cache hit for course %s", course_id)
+            return cached[1]
+
+        existing = _inflight.get(course_id)
+        if existing is not None:
+            return await existing
 
+        future = asyncio.get_running_loop().create_future()
+        _inflight[course_id] = future
         try:
-            r = session.get(url, timeout=30)
-            logger.info(f"API → {r.status_code} for course {course_id}")
+            try:
+                data = await PPTLinksAPI._do_fetch(course_id)
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                data = None
+            if data is not None:
+                _fetch_cache[course_id] = (time.monotonic(), data)
+            future.set_result(data)
+            return data
+        finally:
+            _inflight.pop(course_id, None)
+
+    @staticmethod
+    async def _do_fetch(course_id: str, attempts: int = 3) -> Optional[dict]:
+        """Issue the HTTP GET with the same retry policy as the sync path"""
+        url = f"{API_BASE}/course/user-courses/{course_id}?brief=false&timeZone=Africa/Lagos"
+        client = _get_async_client()
+        # Revalidate with If-None-Match when we hold an ETag - a 304 skips
+        # the body transfer and the JSON parse entirely
+        known = _etags.get(course_id)
+        headers = {'If-None-Match': known[0]} if known else None
+        for attempt in range(attempts):
+            r = await client.get(url, headers=headers)
+            logger.info("API → %s for course %s", r.status_code, course_id)
+            if r.status_code == 304 and known:
+                logger.debug("Course %s unchanged (304) - reusing last payload", course_id)
+                return known[1]
             if r.status_code == 200:
-                return r.json()
-            else:
-                logger.error(f"API error: {r.status_code} | {r.text[:200]}")
-                return None
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
+                # orjson parses the raw bytes several times faster than the
+                # stdlib json path behind r.json()
+                data = orjson.loads(r.content)
+                etag = r.headers.get('ETag')
+                if etag:
+                    _etags[course_id] = (etag, data)
+                return data
+            if r.status_code in (429, 500, 502, 503, 504) and attempt < attempts - 1:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            logger.error(f"API error: {r.status_code} | {r.text[:200]}")
             return None
+        return None
 
     @staticmethod
-    def get_hash(data: dict) -> str:
-        """Generate hash based only on actual content, not dynamic fields
-
-        We only hash the content that matters for notifications:
-        - Course sections and their contents (IDs, names, types)
-        - Quiz details (startTime, endTime, status)
-        - Presentation status (for live classes)
-
-        We EXCLUDE dynamic fields that change on every request:
-        - progress, updatedAt, attempt, user-specific data
+    def content_index(data: dict) -> dict:
+        """Flatten the payload into {content_id: fingerprint}
+
+        The fingerprint keeps only the fields notifications react to:
+        - content name, type and status
+        - presentation status (for live classes)
+        - quiz schedule (startTime, endTime, status, duration)
+        - file reference
+
+        Dynamic fields (progress, updatedAt, attempt, user-specific data)
+        and cosmetic JSON churn never show up in the index, so they can't
+        register as a change. The same index doubles as the old-state map
+        the notifiers diff against.
         """
-        # Extract only the fields that matter for content changes
-        content_data = {
-            'course_id': data.get('id'),
-            'sections': []
-        }
+        index = {}
+        for section in data.get('CourseSection', ()):
+            for item in section.get('contents', ()):
+                quiz = item.get('quiz')
+                index[item['id']] = _ContentFingerprint(
+                    name=item.get('name'),
+                    type=item.get('type'),
+                    status=item.get('status'),
+                    presentation_status=item.get('presentationStatus'),
+                    quiz_status=quiz.get('status') if quiz else None,
+                    quiz_start=quiz.get('startTime') if quiz else None,
+                    quiz_end=quiz.get('endTime') if quiz else None,
+                    quiz_duration=quiz.get('duration') if quiz else None,
+                    file=repr(item.get('file')),
+                )
+        return index
 
-        for section in data.get('CourseSection', []):
-            section_content = {
-                'id': section.get('id'),
-                'title': section.get('title'),
-                'contents': []
-            }
-
-            for item in section.get('contents', []):
-                # Only include fields that indicate actual content changes
-                item_content = {
-                    'id': item.get('id'),
-                    'name': item.get('name'),
-                    'type': item.get('type'),
-                    'status': item.get('status'),
-                    'presentationStatus': item.get('presentationStatus'),  # For live classes
-                }
-
-                # For quizzes, include schedule info
-                if item.get('type') == 'QUIZ' and 'quiz' in item:
-                    item_content['quiz'] = {
-                        'status': item['quiz'].get('status'),
-                        'startTime': item['quiz'].get('startTime'),
-                        'endTime': item['quiz'].get('endTime'),
-                        'duration': item['quiz'].get('duration')
-                    }
-
-                # For files, include the file path
-                if 'file' in item:
-                    item_content['file'] = item.get('file')
-
-                section_content['contents'].append(item_content)
-
-            content_data['sections'].append(section_content)
-
-        # Generate hash from filtered content only
-        hash_str = hashlib.md5(json.dumps(content_data, sort_keys=True).encode()).hexdigest()
-        logger.debug(f"Generated content hash: {hash_str[:8]}... (filtered data)")
+    @staticmethod
+    def get_hash(data: dict) -> str:
+        """Hash the semantic content fingerprint of a course payload
+
+        Digesting the sorted content index instead of the raw JSON keeps the
+        hash stable across upstream ordering/whitespace flips - 16 bytes is
+        plenty for a change-detection checksum. Chunks stream into the
+        digest one fingerprint at a time; going through the index (rather
+        than hashing raw payload fields directly) keeps the hash and the
+        diff reacting to exactly the same set of fields.
+        """
+        index = PPTLinksAPI.content_index(data)
+        hash_str = _content_digest(
+            repr(item).encode() for item in sorted(index.items())
+        )
+        logger.debug("Generated content hash: %s... (fingerprint index)", hash_str[:8])
         return hash_str
 
 
 # ================================
 # KEYBOARD LAYOUTS
 # ================================
+@functools.lru_cache(maxsize=256)
+def _btn_cb(label: str, cb: str) -> InlineKeyboardButton:
+    """Cached callback button - buttons are immutable, so repeats are shared"""
+    return InlineKeyboardButton(label, callback_data=cb)
+
+
+@functools.lru_cache(maxsize=256)
+def _btn_url(label: str, url: str) -> InlineKeyboardButton:
+    """Cached URL button"""
+    return InlineKeyboardButton(label, url=url)
+
+
+@functools.lru_cache(maxsize=1024)
+def _course_footer_rows(course_id: str) -> tuple:
+    """Shared 'View Course' / 'My Courses' rows on every notification keyboard"""
+    return (
+        [_btn_url(f"{Emoji.BOOK} View Course", COURSE_URL(cid=course_id))],
+        [_btn_cb(f"{Emoji.CHART} My Courses", "mycourses")],
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def _unsub_confirm_menu(course_id: str) -> InlineKeyboardMarkup:
+    """Yes/Cancel confirmation keyboard, cached per course like the action menu"""
+    return InlineKeyboardMarkup([
+        [
+            _btn_cb(f"{Emoji.CHECK} Yes, Unsubscribe", f"confirm_unsub_{course_id}"),
+            _btn_cb(f"{Emoji.BACK} Cancel", f"course_detail_{course_id}")
+        ]
+    ])
+
+
+@functools.lru_cache(maxsize=2048)
+def _course_action_menu(course_id: str) -> InlineKeyboardMarkup:
+    """Per-course action keyboard, cached since it only varies by course_id"""
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.BOOK} View Course Details", url=COURSE_URL(cid=course_id))
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BELL} Notification Status", callback_data=f"course_notif_{course_id}")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.WARNING} Unsubscribe", callback_data=f"unsub_course_{course_id}")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BACK} Back to My Courses", callback_data="mycourses")
+        ]
+    ])
+
+
 class Keyboards:
+    __slots__ = ()  # pure namespace - never instantiated
+
+    # Main menu with quick actions - markups are immutable, build once and share
+    MAIN_MENU = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.BOOK} My Courses", callback_data="mycourses"),
+            InlineKeyboardButton(f"{Emoji.ROCKET} Add Course", callback_data="add_course")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.CHART} Statistics", callback_data="stats"),
+            InlineKeyboardButton(f"{Emoji.BELL} Notifications", callback_data="notification_settings")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.GEAR} Settings", callback_data="settings"),
+            InlineKeyboardButton(f"{Emoji.INFO} Help", callback_data="help")
+        ]
+    ])
+
     @staticmethod
     def main_menu():
-        """Main menu with quick actions"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.BOOK} My Courses", callback_data="mycourses"),
-                InlineKeyboardButton(f"{Emoji.ROCKET} Add Course", callback_data="add_course")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.CHART} Statistics", callback_data="stats"),
-                InlineKeyboardButton(f"{Emoji.BELL} Notifications", callback_data="notification_settings")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.GEAR} Settings", callback_data="settings"),
-                InlineKeyboardButton(f"{Emoji.INFO} Help", callback_data="help")
-            ]
+        return Keyboards.MAIN_MENU
+
+    # Welcome menu for first-time users - markups are immutable, build once and share
+    WELCOME_MENU = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.ROCKET} Subscribe to Course", callback_data="add_course")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.INFO} How It Works", callback_data="how_it_works"),
+            InlineKeyboardButton(f"{Emoji.GEAR} View Commands", callback_data="help")
         ]
-        return InlineKeyboardMarkup(keyboard)
+    ])
 
     @staticmethod
     def welcome_menu():
-        """Welcome menu for first-time users"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.ROCKET} Subscribe to Course", callback_data="add_course")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.INFO} How It Works", callback_data="how_it_works"),
-                InlineKeyboardButton(f"{Emoji.GEAR} View Commands", callback_data="help")
-            ]
+        return Keyboards.WELCOME_MENU
+
+    # Settings and preferences - markups are immutable, build once and share
+    SETTINGS_MENU = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.BELL} Notification Settings", callback_data="notification_settings"),
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BOOK} Manage Courses", callback_data="manage_courses"),
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.WARNING} Unsubscribe All", callback_data="confirm_unsub"),
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")
         ]
-        return InlineKeyboardMarkup(keyboard)
+    ])
 
     @staticmethod
     def settings_menu():
-        """Settings and preferences"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.BELL} Notification Settings", callback_data="notification_settings"),
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BOOK} Manage Courses", callback_data="manage_courses"),
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.WARNING} Unsubscribe All", callback_data="confirm_unsub"),
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")
-            ]
+        return Keyboards.SETTINGS_MENU
+
+    # Notification preferences - markups are immutable, build once and share
+    NOTIFICATION_SETTINGS_MENU = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.FILE} Content Uploads: ON", callback_data="toggle_content_notif")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BRAIN} Quiz Reminders: ON", callback_data="toggle_quiz_notif")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.TEACHER} Live Classes: ON", callback_data="toggle_live_notif")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.CLOCK} Course Expiry: ON", callback_data="toggle_expiry_notif")
+        ],
+        [
+            InlineKeyboardButton(f"{Emoji.BACK} Back to Settings", callback_data="settings")
         ]
-        return InlineKeyboardMarkup(keyboard)
+    ])
 
     @staticmethod
     def notification_settings_menu():
-        """Notification preferences"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.FILE} Content Uploads: ON", callback_data="toggle_content_notif")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BRAIN} Quiz Reminders: ON", callback_data="toggle_quiz_notif")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.TEACHER} Live Classes: ON", callback_data="toggle_live_notif")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.CLOCK} Course Expiry: ON", callback_data="toggle_expiry_notif")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BACK} Back to Settings", callback_data="settings")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return Keyboards.NOTIFICATION_SETTINGS_MENU
 
     @staticmethod
     def course_action_menu(course_id):
         """Actions for a specific course"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.BOOK} View Course Details", url=f"https://pptlinks.com/course/{course_id}")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BELL} Notification Status", callback_data=f"course_notif_{course_id}")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.WARNING} Unsubscribe", callback_data=f"unsub_course_{course_id}")
-            ],
-            [
-                InlineKeyboardButton(f"{Emoji.BACK} Back to My Courses", callback_data="mycourses")
-            ]
+        return _course_action_menu(course_id)
+
+    # Confirmation for unsubscribe - markups are immutable, build once and share
+    CONFIRM_UNSUBSCRIBE = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(f"{Emoji.CHECK} Yes, Unsubscribe", callback_data="do_unsub"),
+            InlineKeyboardButton(f"{Emoji.BACK} Cancel", callback_data="settings")
         ]
-        return InlineKeyboardMarkup(keyboard)
+    ])
 
     @staticmethod
     def confirm_unsubscribe():
-        """Confirmation for unsubscribe"""
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.CHECK} Yes, Unsubscribe", callback_data="do_unsub"),
-                InlineKeyboardButton(f"{Emoji.BACK} Cancel", callback_data="settings")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return Keyboards.CONFIRM_UNSUBSCRIBE
+
+    # Simple back button - markups are immutable, build once and share
+    BACK_TO_MENU = InlineKeyboardMarkup([[InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]])
 
     @staticmethod
     def back_to_menu():
-        """Simple back button"""
-        keyboard = [[InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]]
-        return InlineKeyboardMarkup(keyboard)
+        return Keyboards.BACK_TO_MENU
 
 
 # ================================
 # ENHANCED MESSAGES
 # ================================
-class Msg:
-    @staticmethod
-    def welcome_first_time():
-        return f"""
-{Emoji.WAVE} *Welcome to PPTLinks Notification Bot!*
+# Dynamic notification templates, pre-baked at import time: the emoji
+# interpolations are resolved once here, so each call only substitutes the
+# actual message arguments.
+_SUBSCRIBED_TMPL = f"""
+{_PARTY} *Subscription Successful!*
 
-{Emoji.SPARKLES} Your personal learning assistant is ready!
+{_HR}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_BOOK} *Course:* {{name}}
+{_PIN} *Course ID:* `{{course_id}}`
 
-*What I can do for you:*
+{_HR}
 
-{Emoji.BELL} *Real-time Notifications*
-  • New content uploads (PPTs, Videos)
-  • Live class alerts when they start
+{_CHECK} *You're all set!*
 
-{Emoji.FIRE} *Smart Reminders*
-  • Quiz starting (1 day before)
-  • Quiz deadline (1 day before)
-  • Course expiry (1 week before)
+{_BELL} I'll notify you about:
+  • New learning materials
+  • Quiz schedules & reminders
+  • Important deadlines
+  • Course updates
 
-{Emoji.CHART} *Progress Tracking*
-  • Monitor all your courses
-  • Track notification history
+{_CLOCK} *Auto-check:* Every 10 minutes
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
+{_LIGHT} _Tip: Use the menu below to manage your courses_
+"""
 
-{Emoji.ROCKET} *Ready to start?*
+_NEW_FILE_TMPL = f"""
+{_SPARKLES} *New Content Alert!* {{emoji}}
 
-Use the buttons below to:
-• Subscribe to a course
-• View available commands
-• Get help
+{_HR}
 
-━━━━━━━━━━━━━━━━━━━━━━━
-_Powered by PPTLinks_ {Emoji.STAR}
-"""
+{_BOOK} *Course:* {{course}}
 
-    @staticmethod
-    def subscribed(name, course_id):
-        return f"""
-{Emoji.PARTY} *Subscription Successful!*
+{{emoji}} *Material:* {{name}}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_TARGET} Your learning journey continues!
 
-{Emoji.BOOK} *Course:* {name}
-{Emoji.PIN} *Course ID:* `{course_id}`
+{_HR}
+"""
 
-━━━━━━━━━━━━━━━━━━━━━━━
+_NEW_QUIZ_TMPL = f"""
+{_BRAIN} *New Quiz Available!* {_QUIZ}
 
-{Emoji.CHECK} *You're all set!*
+{_HR}
 
-{Emoji.BELL} I'll notify you about:
-  • New learning materials
-  • Quiz schedules & reminders
-  • Important deadlines
-  • Course updates
+{_BOOK} *Course:* {{course}}
+{_QUIZ} *Quiz:* {{title}}
+
+{_CALENDAR} *Schedule:*
+  {_CLOCK} *Start:* {{start}}
+  {_HOURGLASS} *End:* {{end}}
+
+{_HR}
 
-{Emoji.CLOCK} *Auto-check:* Every 10 minutes
+{_FIRE} *Prepare yourself and ace it!*
 
-━━━━━━━━━━━━━━━━━━━━━━━
-{Emoji.LIGHT} _Tip: Use the menu below to manage your courses_
+{_LIGHT} _You'll get a reminder when it starts_
 """
 
-    @staticmethod
-    def initial_course_info(course_data):
-        """Generate comprehensive initial course notification"""
-        name = course_data.get('name', 'Course')
-        description = course_data.get('description', 'No description available')
-        sections = course_data.get('CourseSection', [])
+_QUIZ_START_TMPL = f"""
+{_ROCKET} *Hey! Your Quiz Starts Tomorrow!* {_FIRE}
 
-        # Count resources
-        total_videos = 0
-        total_files = 0
-        total_quizzes = 0
-        upcoming_quizzes = []
+{_HR}
 
-        for section in sections:
-            for content in section.get('contents', []):
-                if content['type'] == 'VIDEO':
-                    total_videos += 1
-                elif content['type'] == 'PPT':
-                    total_files += 1
-                elif content['type'] == 'QUIZ':
-                    total_quizzes += 1
-                    quiz = content.get('quiz', {})
-                    start_time = quiz.get('startTime')
-                    if start_time:
-                        try:
-                            start_dt = date_parser.parse(start_time)
-                            if start_dt > datetime.now(pytz.timezone('Africa/Lagos')):
-                                upcoming_quizzes.append({
-                                    'name': content['name'],
-                                    'start': format_time(start_time),
-                                    'end': format_time(quiz.get('endTime', ''))
-                                })
-                        except:
-                            pass
-
-        msg = f"""
-{Emoji.PARTY} *Course Successfully Added!*
+{_QUIZ} *%s*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_CLOCK} *Starting in 1 day!*
 
-{Emoji.BOOK} *{name}*
+{_TARGET} Get ready to show what you've learned!
 
-{Emoji.INFO} *Description:*
-{description[:200]}{'...' if len(description) > 200 else ''}
+{_BRAIN} Review your materials and prepare now!
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
-{Emoji.CHART} *Course Content Overview:*
+{_WARNING} _Don't miss it - be ready tomorrow!_
+"""
+
+_QUIZ_ENDING_TMPL = f"""
+{_WARNING} *Quiz Deadline Approaching!* {_HOURGLASS}
+
+{_HR}
+
+{_QUIZ} *%s*
+
+{_CLOCK} *Ends tomorrow!* Only 1 day left!
+
+{_FIRE} Complete it before the deadline!
+
+{_TARGET} Don't miss this opportunity to score!
 
-{Emoji.VIDEO} *Videos:* {total_videos}
-{Emoji.FILE} *Files/PPTs:* {total_files}
-{Emoji.QUIZ} *Quizzes:* {total_quizzes}
+{_HR}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_WARNING} _Finish and submit within 24 hours!_
 """
 
-        if upcoming_quizzes:
-            msg += f"\n{Emoji.CALENDAR} *Upcoming Quizzes:*\n\n"
-            for idx, quiz in enumerate(upcoming_quizzes[:3], 1):
-                msg += f"{idx}. *{quiz['name']}*\n"
-                msg += f"   {Emoji.CLOCK} Start: {quiz['start']}\n"
-                msg += f"   {Emoji.HOURGLASS} End: {quiz['end']}\n\n"
-            if len(upcoming_quizzes) > 3:
-                msg += f"   _...and {len(upcoming_quizzes) - 3} more_\n\n"
-            msg += "━━━━━━━━━━━━━━━━━━━━━━━\n"
+_LIVE_CLASS_TMPL = f"""
+{_ROCKET} *LIVE CLASS STARTING NOW!* {_FIRE}
 
-        msg += f"""
-{Emoji.BELL} *Notifications Active*
+{_HR}
 
-You'll receive alerts for:
-  • New content uploads
-  • Quiz schedules & reminders
-  • Important updates
+{_BOOK} *Course:* %s
+{_TEACHER} *Class:* %s
 
-{Emoji.FIRE} *Ready to start learning!*
+{_TARGET} *The class is now LIVE!*
 
-━━━━━━━━━━━━━━━━━━━━━━━
-{Emoji.LIGHT} _Use the menu below to explore more_
+{_BRAIN} Join now and don't miss out!
+
+{_HR}
+
+{_WARNING} _Click below to join immediately!_
 """
-        return msg
 
-    @staticmethod
-    def new_file(course, name, url, file_type):
-        emoji = Emoji.VIDEO if file_type == "VIDEO" else Emoji.FILE
-        return f"""
-{Emoji.SPARKLES} *New Content Alert!* {emoji}
+_COURSE_EXPIRING_TMPL = f"""
+{_WARNING} *Course Expiring Soon!* {_HOURGLASS}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
-{Emoji.BOOK} *Course:* {course}
+{_BOOK} *Course:* %s
 
-{emoji} *Material:* {name}
+{_CLOCK} *Time Remaining:* %s days
 
-{Emoji.TARGET} Your learning journey continues!
+{_TARGET} Complete your learning materials before access expires!
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_BRAIN} Review remaining content now!
+
+{_HR}
+
+{_WARNING} _Make the most of your remaining time!_
 """
 
-    @staticmethod
-    def new_quiz(course, title, start, end):
-        return f"""
-{Emoji.BRAIN} *New Quiz Available!* {Emoji.QUIZ}
+_STATS_TMPL = f"""
+{_CHART} *Your Learning Statistics* {_TROPHY}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
-{Emoji.BOOK} *Course:* {course}
-{Emoji.QUIZ} *Quiz:* {title}
+{_BOOK} *Active Courses:* {{total_courses}}
+{_BELL} *Notifications Received:* {{total_notifs}}
 
-{Emoji.CALENDAR} *Schedule:*
-  {Emoji.CLOCK} *Start:* {start}
-  {Emoji.HOURGLASS} *End:* {end}
+{_HR}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_FIRE} *Keep up the great work!*
 
-{Emoji.FIRE} *Prepare yourself and ace it!*
+{_STUDENT} Every notification keeps you on track
+{_TARGET} Stay consistent, achieve greatness
 
-{Emoji.LIGHT} _You'll get a reminder when it starts_
+{_HR}
+_Updated in real-time_ {_SPARKLES}
 """
 
-    @staticmethod
-    def quiz_start(title):
-        return f"""
-{Emoji.ROCKET} *Hey! Your Quiz Starts Tomorrow!* {Emoji.FIRE}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+# Initial course info is assembled from pre-baked pieces: emoji and rules
+# are substituted once at import, leaving only the per-course fields
+_ICI_HEADER_TMPL = f"""
+{Emoji.PARTY} *Course Successfully Added!*
 
-{Emoji.QUIZ} *{title}*
+{_HR}
 
-{Emoji.CLOCK} *Starting in 1 day!*
+{Emoji.BOOK} *{{name}}*
 
-{Emoji.TARGET} Get ready to show what you've learned!
+{Emoji.INFO} *Description:*
+{{desc}}
 
-{Emoji.BRAIN} Review your materials and prepare now!
+{_HR}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{Emoji.CHART} *Course Content Overview:*
 
-{Emoji.WARNING} _Don't miss it - be ready tomorrow!_
-"""
+{Emoji.VIDEO} *Videos:* {{videos}}
+{Emoji.FILE} *Files/PPTs:* {{files}}
+{Emoji.QUIZ} *Quizzes:* {{quizzes}}
 
-    @staticmethod
-    def quiz_ending(title):
-        return f"""
-{Emoji.WARNING} *Quiz Deadline Approaching!* {Emoji.HOURGLASS}
+{_HR}
+""".format
 
-━━━━━━━━━━━━━━━━━━━━━━━
+_ICI_QUIZ_HEADER = f"\n{Emoji.CALENDAR} *Upcoming Quizzes:*\n\n"
 
-{Emoji.QUIZ} *{title}*
+_ICI_QUIZ_ROW_TMPL = (
+    f"%d. *%s*\n"
+    f"   {Emoji.CLOCK} Start: %s\n"
+    f"   {Emoji.HOURGLASS} End: %s\n\n"
+)
 
-{Emoji.CLOCK} *Ends tomorrow!* Only 1 day left!
+_ICI_MORE_TMPL = "   _...and %d more_\n\n"
 
-{Emoji.FIRE} Complete it before the deadline!
+_ICI_FOOTER = f"""
+{Emoji.BELL} *Notifications Active*
 
-{Emoji.TARGET} Don't miss this opportunity to score!
+You'll receive alerts for:
+  • New content uploads
+  • Quiz schedules & reminders
+  • Important updates
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{Emoji.FIRE} *Ready to start learning!*
 
-{Emoji.WARNING} _Finish and submit within 24 hours!_
+{_HR}
+{Emoji.LIGHT} _Use the menu below to explore more_
 """
 
-    @staticmethod
-    def live_class_starting(course, title, url):
-        return f"""
-{Emoji.ROCKET} *LIVE CLASS STARTING NOW!* {Emoji.FIRE}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+class Msg:
+    """Message texts: parameterless ones are frozen at import, the rest
+    are pre-baked templates so handlers only pay for the final fill-in."""
+    __slots__ = ()  # pure namespace - never instantiated
+
+    # Rendered once at class-body evaluation; the method just hands the
+    # cached string back
+    WELCOME_FIRST_TIME = f"""
+{Emoji.WAVE} *Welcome to PPTLinks Notification Bot!*
 
-{Emoji.BOOK} *Course:* {course}
-{Emoji.TEACHER} *Class:* {title}
+{Emoji.SPARKLES} Your personal learning assistant is ready!
 
-{Emoji.TARGET} *The class is now LIVE!*
+{_HR}
 
-{Emoji.BRAIN} Join now and don't miss out!
+*What I can do for you:*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{Emoji.BELL} *Real-time Notifications*
+  • New content uploads (PPTs, Videos)
+  • Live class alerts when they start
 
-{Emoji.WARNING} _Click below to join immediately!_
+{Emoji.FIRE} *Smart Reminders*
+  • Quiz starting (1 day before)
+  • Quiz deadline (1 day before)
+  • Course expiry (1 week before)
+
+{Emoji.CHART} *Progress Tracking*
+  • Monitor all your courses
+  • Track notification history
+
+{_HR}
+
+{Emoji.ROCKET} *Ready to start?*
+
+Use the buttons below to:
+• Subscribe to a course
+• View available commands
+• Get help
+
+{_HR}
+_Powered by PPTLinks_ {Emoji.STAR}
 """
 
     @staticmethod
-    def course_expiring(course, days_left):
-        return f"""
-{Emoji.WARNING} *Course Expiring Soon!* {Emoji.HOURGLASS}
+    def welcome_first_time():
+        return Msg.WELCOME_FIRST_TIME
 
-━━━━━━━━━━━━━━━━━━━━━━━
+    @staticmethod
+    def subscribed(name, course_id):
+        return _SUBSCRIBED_TMPL.format(name=name, course_id=course_id)
 
-{Emoji.BOOK} *Course:* {course}
+    @staticmethod
+    def _ellipsize(s, n=200):
+        """Truncate s to n chars, appending an ellipsis only when needed."""
+        return s if len(s) <= n else s[:n] + '…'
 
-{Emoji.CLOCK} *Time Remaining:* {days_left} days
+    @staticmethod
+    def initial_course_info(course_data):
+        """Generate comprehensive initial course notification"""
+        name = course_data.get('name', 'Course')
+        description = course_data.get('description', 'No description available')
+        sections = course_data.get('CourseSection', ())
 
-{Emoji.TARGET} Complete your learning materials before access expires!
+        # Count resources with Counter over a flat content stream - the
+        # per-type tallies happen in C instead of Python branch bytecode
+        contents = list(chain.from_iterable(s.get('contents', ()) for s in sections))
+        counts = Counter(c['type'] for c in contents)
+        total_videos = counts.get('VIDEO', 0)
+        total_files = counts.get('PPT', 0)
+        total_quizzes = counts.get('QUIZ', 0)
 
-{Emoji.BRAIN} Review remaining content now!
+        upcoming_quizzes = []
+        # One clock read for the whole walk rather than one per quiz
+        now = datetime.now(LAGOS_TZ)
+
+        # Narrow second pass over quizzes only
+        for content in contents:
+            if content['type'] != 'QUIZ':
+                continue
+            quiz = content.get('quiz')
+            start_time = quiz.get('startTime') if quiz else None
+            if start_time:
+                try:
+                    start_dt = parse_datetime(start_time)
+                    if start_dt > now:
+                        upcoming_quizzes.append({
+                            'name': content['name'],
+                            'start': format_time(start_time),
+                            'end': format_time(quiz.get('endTime', ''))
+                        })
+                except (ValueError, TypeError):
+                    # Unparseable startTime - skip the upcoming listing
+                    pass
+
+        # Accumulate into a list and join once - repeated += concatenation
+        # degrades badly on long messages
+        parts = [_ICI_HEADER_TMPL(
+            name=name, desc=Msg._ellipsize(description),
+            videos=total_videos, files=total_files, quizzes=total_quizzes
+        )]
 
-━━━━━━━━━━━━━━━━━━━━━━━
+        if upcoming_quizzes:
+            parts.append(_ICI_QUIZ_HEADER)
+            for idx, quiz in enumerate(upcoming_quizzes[:3], 1):
+                parts.append(_ICI_QUIZ_ROW_TMPL
+                             % (idx, quiz['name'], quiz['start'], quiz['end']))
+            if len(upcoming_quizzes) > 3:
+                parts.append(_ICI_MORE_TMPL % (len(upcoming_quizzes) - 3))
+            parts.append(_HR + "\n")
 
-{Emoji.WARNING} _Make the most of your remaining time!_
-"""
+        parts.append(_ICI_FOOTER)
+        return "".join(parts)
+
+    @staticmethod
+    def new_file(course, name, url, file_type):
+        emoji = Emoji.VIDEO if file_type == "VIDEO" else Emoji.FILE
+        return _NEW_FILE_TMPL.format(emoji=emoji, course=course, name=name)
+
+    @staticmethod
+    def new_quiz(course, title, start, end):
+        return _NEW_QUIZ_TMPL.format(course=course, title=title, start=start, end=end)
+
+    @staticmethod
+    def quiz_start(title):
+        return _QUIZ_START_TMPL % title
+
+    @staticmethod
+    def quiz_ending(title):
+        return _QUIZ_ENDING_TMPL % title
+
+    @staticmethod
+    def live_class_starting(course, title, url):
+        return _LIVE_CLASS_TMPL % (course, title)
+
+    @staticmethod
+    def course_expiring(course, days_left):
+        return _COURSE_EXPIRING_TMPL % (course, days_left)
 
     @staticmethod
     def my_courses(courses_list):
-        if not courses_list:
+        # Materialize once so generators and DB cursors work, and len() is free
+        courses = courses_list if isinstance(courses_list, list) else list(courses_list)
+        if not courses:
             return f"""
 {Emoji.INFO} *No Active Subscriptions*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 You haven't subscribed to any courses yet.
 
@@ -560,95 +839,82 @@ You haven't subscribed to any courses yet.
 
 Click the button below to add your first course!
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
-        msg = f"""
+        parts = [f"""
 {Emoji.BOOK} *Your Learning Dashboard* {Emoji.CHART}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
-*Active Courses ({len(courses_list)}):*
+*Active Courses ({len(courses)}):*
 
-"""
-        for idx, (name, cid) in enumerate(courses_list, 1):
-            msg += f"{idx}. {Emoji.STAR} *{name}*\n"
-            msg += f"   {Emoji.PIN} Course ID: `{cid}`\n"
-            msg += f"   {Emoji.BELL} Notifications: Active\n\n"
+"""]
+        star, pin, bell = Emoji.STAR, Emoji.PIN, Emoji.BELL
+        parts_extend = parts.extend
+        for idx, (name, cid) in enumerate(courses, 1):
+            parts_extend((
+                f"{idx}. {star} *{name}*\n",
+                f"   {pin} Course ID: `{cid}`\n",
+                f"   {bell} Notifications: Active\n\n",
+            ))
 
-        msg += f"""━━━━━━━━━━━━━━━━━━━━━━━
+        parts.append(f"""{_HR}
 
 {Emoji.BELL} All courses are being monitored
 {Emoji.CLOCK} Checked every 10 minutes
 {Emoji.TARGET} Stay focused and keep learning!
 
-━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        return msg
+{_HR}
+""")
+        return "".join(parts)
 
     @staticmethod
     def manage_courses(courses_list):
-        if not courses_list:
+        courses = courses_list if isinstance(courses_list, list) else list(courses_list)
+        if not courses:
             return f"""
 {Emoji.INFO} *Manage Courses*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 You have no active course subscriptions.
 
 {Emoji.ROCKET} Add a course to get started!
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
-        msg = f"""
+        parts = [f"""
 {Emoji.GEAR} *Manage Your Courses*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Select a course below to:
 • View details
 • Check notification status
 • Unsubscribe
 
- *Your Courses ({len(courses_list)}):*
+ *Your Courses ({len(courses)}):*
 
-"""
-        for idx, (name, cid) in enumerate(courses_list, 1):
-            msg += f"{idx}. *{name}*\n"
+"""]
+        parts_append = parts.append
+        for idx, (name, cid) in enumerate(courses, 1):
+            parts_append(f"{idx}. *{name}*\n")
 
-        msg += f"""
-━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        return msg
+        parts.append(f"""
+{_HR}
+""")
+        return "".join(parts)
 
     @staticmethod
     def stats(total_courses, total_notifs):
-        return f"""
-{Emoji.CHART} *Your Learning Statistics* {Emoji.TROPHY}
-
-━━━━━━━━━━━━━━━━━━━━━━━
+        return _STATS_TMPL.format(total_courses=total_courses, total_notifs=total_notifs)
 
-{Emoji.BOOK} *Active Courses:* {total_courses}
-{Emoji.BELL} *Notifications Received:* {total_notifs}
-
-━━━━━━━━━━━━━━━━━━━━━━━
-
-{Emoji.FIRE} *Keep up the great work!*
-
-{Emoji.STUDENT} Every notification keeps you on track
-{Emoji.TARGET} Stay consistent, achieve greatness
-
-━━━━━━━━━━━━━━━━━━━━━━━
-_Updated in real-time_ {Emoji.SPARKLES}
-"""
-
-    @staticmethod
-    def help_menu():
-        return f"""
+    HELP_MENU = f"""
 {Emoji.INFO} *Help & Support* {Emoji.LIGHT}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 *📱 Available Commands:*
 
@@ -659,7 +925,7 @@ _Updated in real-time_ {Emoji.SPARKLES}
 {Emoji.WARNING} `/unsubscribe` - Unsubscribe from all courses
 {Emoji.INFO} `/help` - Show this menu
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 *🔔 Notification Types:*
 
@@ -669,7 +935,7 @@ _Updated in real-time_ {Emoji.SPARKLES}
 {Emoji.TEACHER} *Live Classes* - When class goes live
 {Emoji.CLOCK} *Course Expiry* - 1 week before access ends
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 *⚙️ Features:*
 
@@ -678,22 +944,24 @@ _Updated in real-time_ {Emoji.SPARKLES}
 {Emoji.GEAR} Customizable notification preferences
 {Emoji.TARGET} Auto-deactivation on course expiry
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.TEACHER} *Need Support?*
 Contact PPTLinks support team
 Visit: https://pptlinks.com/support
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 _Made with_ {Emoji.STAR} _for PPTLinks students_
 """
 
     @staticmethod
-    def how_it_works():
-        return f"""
+    def help_menu():
+        return Msg.HELP_MENU
+
+    HOW_IT_WORKS = f"""
 {Emoji.LIGHT} *How PPTLinks Bot Works* {Emoji.ROCKET}
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 *Step 1: Subscribe to Courses* {Emoji.BOOK}
 Click the subscription link you receive from PPTLinks when you enroll, or use `/start <course_id>` command. You can subscribe to multiple courses!
@@ -720,19 +988,21 @@ Click the buttons in notifications to:
 • Start quizzes
 • View course details
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.FIRE} *Never miss a class or deadline again!*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
     @staticmethod
-    def add_course_instructions():
-        return f"""
+    def how_it_works():
+        return Msg.HOW_IT_WORKS
+
+    ADD_COURSE_INSTRUCTIONS = f"""
 {Emoji.ROCKET} *Subscribe to Your Course*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.INFO} *How to Subscribe:*
 
@@ -743,7 +1013,7 @@ The link looks like:
 
 {Emoji.TARGET} *Just click that link* and you'll be automatically subscribed!
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.GEAR} *Alternative Method:*
 
@@ -753,36 +1023,40 @@ If you have your Course ID, use this command:
 *Example:*
 `/start abc123xyz456def789`
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.LIGHT} *Can't find your link?*
 Contact PPTLinks support or check your course enrollment page.
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
     @staticmethod
-    def settings():
-        return f"""
+    def add_course_instructions():
+        return Msg.ADD_COURSE_INSTRUCTIONS
+
+    SETTINGS = f"""
 {Emoji.GEAR} *Settings & Preferences*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.BELL} *Notifications:* Active
 {Emoji.CLOCK} *Check Interval:* 10 minutes
 {Emoji.TARGET} *Auto-monitoring:* Enabled
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Use the buttons below to manage your settings.
 """
 
     @staticmethod
-    def unsubscribe_confirm():
-        return f"""
+    def settings():
+        return Msg.SETTINGS
+
+    UNSUBSCRIBE_CONFIRM = f"""
 {Emoji.WARNING} *Confirm Unsubscribe*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Are you sure you want to unsubscribe from all courses?
 
@@ -793,15 +1067,17 @@ Are you sure you want to unsubscribe from all courses?
 
 You can resubscribe anytime using /start
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
     @staticmethod
-    def unsubscribed():
-        return f"""
+    def unsubscribe_confirm():
+        return Msg.UNSUBSCRIBE_CONFIRM
+
+    UNSUBSCRIBED = f"""
 {Emoji.CHECK} *Unsubscribed Successfully*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 You've been removed from all course notifications.
 
@@ -810,30 +1086,34 @@ You've been removed from all course notifications.
 {Emoji.ROCKET} Want to come back?
 Use /start anytime to resubscribe.
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
     @staticmethod
-    def already_subscribed():
-        return f"""
+    def unsubscribed():
+        return Msg.UNSUBSCRIBED
+
+    ALREADY_SUBSCRIBED = f"""
 {Emoji.CHECK} *Already Subscribed!*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 You're already receiving updates for this course.
 
 {Emoji.CHART} Check /mycourses to see all subscriptions
 {Emoji.GEAR} Use /settings to manage preferences
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
     @staticmethod
-    def api_error():
-        return f"""
+    def already_subscribed():
+        return Msg.ALREADY_SUBSCRIBED
+
+    API_ERROR = f"""
 {Emoji.WARNING} *Connection Error*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Unable to fetch course data right now.
 
@@ -841,17 +1121,164 @@ Unable to fetch course data right now.
 
 {Emoji.INFO} If the issue persists, contact support.
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
 
+    @staticmethod
+    def api_error():
+        return Msg.API_ERROR
+
+
+# python-telegram-bot only accepts str for outgoing text, so the static
+# messages can't usefully be pre-encoded to bytes; interning them at least
+# pins one shared object per message for the life of the process.
+for _name in ('WELCOME_FIRST_TIME', 'HELP_MENU', 'HOW_IT_WORKS',
+              'ADD_COURSE_INSTRUCTIONS', 'SETTINGS', 'UNSUBSCRIBE_CONFIRM',
+              'UNSUBSCRIBED', 'ALREADY_SUBSCRIBED', 'API_ERROR'):
+    setattr(Msg, _name, sys.intern(getattr(Msg, _name)))
+del _name
+
 
 # ================================
 # MONITOR
 # ================================
+# Content types that count as downloadable/watchable files
+FILE_TYPES = frozenset({'PPT', 'VIDEO'})
+
+# Telegram allows ~30 messages/sec globally; cap concurrent sends just below
+# that so gathered bursts don't trip the flood limit
+_send_semaphore = asyncio.Semaphore(25)
+
+
+class _SendRateLimiter:
+    """Paces outbound sends to Telegram's flood limits.
+
+    Hands out send slots at ~30 msg/s globally and 1 msg/s per chat, so a
+    burst of gathered notifications drains as a smooth stream instead of a
+    spike of RetryAfter errors.
+    """
+
+    def __init__(self, global_rate: float = 30.0, per_chat_interval: float = 1.0):
+        self._global_interval = 1.0 / global_rate
+        self._per_chat_interval = per_chat_interval
+        self._next_global = 0.0
+        self._next_per_chat: dict = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, chat_id):
+        async with self._lock:
+            now = time.monotonic()
+            g = max(now, self._next_global)
+            self._next_global = g + self._global_interval
+            p = max(now, self._next_per_chat.get(chat_id, 0.0))
+            slot = max(g, p)
+            self._next_per_chat[chat_id] = slot + self._per_chat_interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_send_limiter = _SendRateLimiter()
+
+
+_DURATION_DAYS = {
+    'ONE_MONTH': 30,
+    'TWO_MONTHS': 60,
+    'THREE_MONTHS': 90,
+    'SIX_MONTHS': 180,
+    'ONE_YEAR': 365,
+}
+
+
+@functools.lru_cache(maxsize=8192)
+def _expiry_dates(sub_date_str: str, days: int):
+    """(expiry_date, notify_date) for a subscription - pure function of the
+    subscription date and course duration, so cache it across poll cycles"""
+    sub_dt = parse_datetime(sub_date_str)
+    if sub_dt.tzinfo is None:
+        sub_dt = sub_dt.replace(tzinfo=LAGOS_TZ)
+    expiry_date = sub_dt + timedelta(days=days)
+    return expiry_date, expiry_date - timedelta(days=7)
+
+
+def _add_poll_job(monitor, course_id):
+    """Register the shared per-course poll job with a randomized phase
+
+    Every job getting the same start tick would slam the API and SQLite
+    once per interval; a random first run plus per-fire jitter spreads the
+    polls near-uniformly across the window instead.
+    """
+    scheduler.add_job(
+        monitor.check_course, 'interval', seconds=POLL_INTERVAL,
+        jitter=POLL_INTERVAL // 4,
+        next_run_time=datetime.now(LAGOS_TZ) + timedelta(
+            seconds=random.uniform(30, POLL_INTERVAL)),
+        args=[course_id], id=f"poll_{course_id}", replace_existing=True
+    )
+
+
 class Monitor:
+    # Last stored content hash per course, shared across instances. Lets a
+    # check bail out before any DB work when the payload hasn't changed -
+    # with N subscribers per course only the first check per change event
+    # touches SQLite.
+    _hash_cache: dict = {}
+
+    # Rendered initial-course messages keyed by (course_id, content_hash):
+    # every subscriber of a course gets the same text, so render it once per
+    # content revision instead of once per subscriber.
+    _info_cache: dict = {}
+
+    # Expiry datetime currently on the scheduler per (chat_id, course_id) -
+    # lets schedule_course_expiry skip re-adding identical jobs every poll
+    _scheduled_expiry: dict = {}
+
+    # Signature of each quiz reminder job currently on the scheduler
+    # (job_id -> trigger time) so unchanged quizzes skip the add_job call
+    _job_state: dict = {}
+
+    # (payload object, hash) per course. The fetch layer hands back the
+    # same dict object on TTL-cache hits and 304 revalidations, so an
+    # identity check lets the poll skip re-hashing an unchanged payload.
+    _payload_memo: dict = {}
+
+    @staticmethod
+    def _hash_payload(course_id, data):
+        """Hash a payload, reusing the last digest when the object is unchanged"""
+        memo = Monitor._payload_memo.get(course_id)
+        if memo is not None and memo[0] is data:
+            return memo[1]
+        new_hash = PPTLinksAPI.get_hash(data)
+        Monitor._payload_memo[course_id] = (data, new_hash)
+        return new_hash
+
     def __init__(self, app):
         self.app = app
 
+    @staticmethod
+    def _sched_fingerprint(index, duration):
+        """The slice of a content index that APScheduler jobs depend on
+
+        Only quiz start/end times and the course duration feed into the
+        reminder and expiry jobs, so rescheduling can be skipped when this
+        slice is unchanged even though other content moved.
+        """
+        return duration, tuple(sorted(
+            (cid, fp.quiz_start, fp.quiz_end)
+            for cid, fp in index.items() if fp.type == 'QUIZ'
+        ))
+
+    @staticmethod
+    def _render_initial_info(course_id, content_hash, data):
+        key = (course_id, content_hash)
+        text = Monitor._info_cache.get(key)
+        if text is None:
+            if len(Monitor._info_cache) > 256:
+                Monitor._info_cache.clear()
+            text = Msg.initial_course_info(data)
+            Monitor._info_cache[key] = text
+        return text
+
     async def check(self, chat_id: int, course_id: str):
         """Check for course updates and send notifications
 
@@ -859,22 +1286,30 @@ class Monitor:
             chat_id: User's Telegram chat ID
             course_id: The PPTLinks course ID (required)
         """
-        data = PPTLinksAPI.fetch_course_data(course_id)
+        data = await PPTLinksAPI.fetch_course_data_async(course_id)
         if not data:
             logger.warning(f"Failed to fetch course data for user {chat_id}, course {course_id}")
             return
 
-        new_hash = PPTLinksAPI.get_hash(data)
-        cached = db.get_course_data(course_id)
+        new_hash = Monitor._hash_payload(course_id, data)
+        if Monitor._hash_cache.get(course_id) == new_hash:
+            logger.debug("✓ No changes for course %s (hash: %s...) - skipped DB check for user %s", course_id, new_hash[:8], chat_id)
+            return
+
+        # DB access goes through a worker thread so the disk I/O can't stall
+        # the event loop that every other poller and handler shares
+        cached = await asyncio.to_thread(db.get_course_data, course_id)
         old_hash = cached['hash'] if cached else None
         name = data.get('name', 'Course')
 
         if not old_hash:
             logger.info(f"✨ First time subscription for user {chat_id}, course {course_id}")
-            db.save_course_data(course_id, name, data, new_hash)
-            await self.send_message(chat_id, Msg.initial_course_info(data), Keyboards.main_menu())
+            await asyncio.to_thread(db.save_course_data, course_id, name, data, new_hash)
+            Monitor._hash_cache[course_id] = new_hash
+            await self.send_message(chat_id, Monitor._render_initial_info(course_id, new_hash, data), Keyboards.main_menu())
             db.log_notification(chat_id, course_id, "initial_course", f"Initial course info for {name}")
             await self.schedule(data, chat_id, course_id)
+            await asyncio.to_thread(db.flush_notifications)
             logger.info(f"📧 Sent initial course notification to user {chat_id}")
             return
 
@@ -882,130 +1317,220 @@ class Monitor:
             logger.info(f"🔄 CONTENT CHANGED for course {course_id} (old: {old_hash[:8]}..., new: {new_hash[:8]}...)")
             logger.info(f"📢 Sending update notifications to user {chat_id}")
             old = cached['data']
-            await self.notify_files(chat_id, name, old, data, course_id)
-            await self.notify_quizzes(chat_id, name, old, data, course_id)
-            await self.notify_live_classes(chat_id, name, old, data, course_id)
-            db.save_course_data(course_id, name, data, new_hash)
-            await self.schedule(data, chat_id, course_id)
+            # One fingerprint walk of the old payload serves both notifier passes
+            old_index = PPTLinksAPI.content_index(old)
+            events = Monitor._diff_events(old_index, data)
+            await self._diff_and_notify(chat_id, name, events, course_id)
+            await asyncio.to_thread(db.save_course_data, course_id, name, data, new_hash)
+            Monitor._hash_cache[course_id] = new_hash
+            # Rescheduling replaces every quiz job even when identical; skip
+            # it unless the schedule-relevant slice of the content changed
+            new_index = PPTLinksAPI.content_index(data)
+            if (Monitor._sched_fingerprint(old_index, old.get('duration'))
+                    != Monitor._sched_fingerprint(new_index, data.get('duration'))):
+                await self.schedule(data, chat_id, course_id)
+            else:
+                logger.debug("Quiz schedule unchanged for course %s - jobs left in place", course_id)
+            await asyncio.to_thread(db.flush_notifications)
             logger.info(f"✅ Course data updated and notifications sent to user {chat_id}")
         else:
-            logger.debug(f"✓ No changes detected for course {course_id} (hash: {new_hash[:8]}...) - user {chat_id}")
+            Monitor._hash_cache[course_id] = new_hash
+            logger.debug("✓ No changes detected for course %s (hash: %s...) - user %s", course_id, new_hash[:8], chat_id)
+
+    async def check_course(self, course_id: str):
+        """Poll one course and fan out notifications to every subscriber
+
+        Runs as the single per-course job: the fetch, hash and diff happen
+        once no matter how many users follow the course, and only the
+        per-chat sends scale with the subscriber count.
+        """
+        data = await PPTLinksAPI.fetch_course_data_async(course_id)
+        if not data:
+            logger.warning(f"Failed to fetch course data for course {course_id}")
+            return
+
+        new_hash = Monitor._hash_payload(course_id, data)
+        if Monitor._hash_cache.get(course_id) == new_hash:
+            logger.debug("✓ No changes for course %s (hash: %s...)", course_id, new_hash[:8])
+            return
+
+        cached = await asyncio.to_thread(db.get_course_data, course_id)
+        old_hash = cached['hash'] if cached else None
+        name = data.get('name', 'Course')
+        subscribers = await asyncio.to_thread(db.get_course_subscribers, course_id)
+
+        if not old_hash:
+            await asyncio.to_thread(db.save_course_data, course_id, name, data, new_hash)
+            Monitor._hash_cache[course_id] = new_hash
+            text = Monitor._render_initial_info(course_id, new_hash, data)
+            for chat_id in subscribers:
+                await self.send_message(chat_id, text, Keyboards.main_menu())
+                db.log_notification(chat_id, course_id, "initial_course", f"Initial course info for {name}")
+                await self.schedule(data, chat_id, course_id)
+            await asyncio.to_thread(db.flush_notifications)
+            return
+
+        if new_hash != old_hash:
+            logger.info(f"🔄 CONTENT CHANGED for course {course_id} (old: {old_hash[:8]}..., new: {new_hash[:8]}...)")
+            old = cached['data']
+            old_index = PPTLinksAPI.content_index(old)
+            new_index = PPTLinksAPI.content_index(data)
+            reschedule = (Monitor._sched_fingerprint(old_index, old.get('duration'))
+                          != Monitor._sched_fingerprint(new_index, data.get('duration')))
+            # Walk the payload once; every subscriber gets the same events
+            events = Monitor._diff_events(old_index, data)
+            for chat_id in subscribers:
+                await self._diff_and_notify(chat_id, name, events, course_id)
+                if reschedule:
+                    await self.schedule(data, chat_id, course_id)
+            await asyncio.to_thread(db.save_course_data, course_id, name, data, new_hash)
+            Monitor._hash_cache[course_id] = new_hash
+            await asyncio.to_thread(db.flush_notifications)
+            logger.info(f"✅ Course {course_id} updated, {len(subscribers)} subscribers notified")
+        else:
+            Monitor._hash_cache[course_id] = new_hash
+
 
     async def send_message(self, chat_id, text, keyboard=None):
-        """Send message to user"""
-        try:
-            message = await self.app.bot.send_message(
-                chat_id,
-                text,
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=keyboard
-            )
-            logger.info(f"✅ Notification delivered to {chat_id} (message_id: {message.message_id})")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to send notification to {chat_id}: {e}")
-            return False
-
-    async def notify_files(self, chat_id, course, old, new, course_id):
-        """Notify about new files/videos"""
-        old_ids = {i['id'] for s in old.get('CourseSection', []) for i in s.get('contents', []) if i['type'] in ['PPT', 'VIDEO']}
-
-        new_files_count = 0
-        for s in new.get('CourseSection', []):
-            for i in s.get('contents', []):
-                if i['type'] in ['PPT', 'VIDEO'] and i['id'] not in old_ids:
-                    new_files_count += 1
-                    # Always link to the content within the course on PPTLinks
-                    content_url = f"https://pptlinks.com/course/{course_id}/content/{i['id']}"
-
-                    logger.info(f"🔔 NEW CONTENT DETECTED: {i['type']} '{i['name']}' in course {course_id}")
-                    text = Msg.new_file(course, i['name'], content_url, i['type'])
-                    keyboard = InlineKeyboardMarkup([
-                        [InlineKeyboardButton(f"{Emoji.ROCKET} Open in PPTLinks", url=content_url)],
-                        [InlineKeyboardButton(f"{Emoji.BOOK} View Course", url=f"https://pptlinks.com/course/{course_id}")],
-                        [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")]
-                    ])
-                    success = await self.send_message(chat_id, text, keyboard)
-                    if success:
-                        db.log_notification(chat_id, course_id, "new_file", f"New {i['type']}: {i['name']}")
-                        logger.info(f"📄 New {i['type']} notification delivered to {chat_id}: {i['name']}")
-
-        if new_files_count == 0:
-            logger.debug(f"No new files detected for course {course_id}")
-
-    async def notify_quizzes(self, chat_id, course, old, new, course_id):
-        """Notify about new quizzes"""
-        old_ids = {i['id'] for s in old.get('CourseSection', []) for i in s.get('contents', []) if i['type'] == 'QUIZ'}
-
-        for s in new.get('CourseSection', []):
-            for i in s.get('contents', []):
-                if i['type'] == 'QUIZ' and i['id'] not in old_ids:
-                    q = i['quiz']
-                    start = format_time(q.get('startTime'))
-                    end = format_time(q.get('endTime'))
-                    # Link to quiz within course context
-                    quiz_url = f"https://pptlinks.com/course/{course_id}/content/{i['id']}"
-
-                    logger.info(f"🔔 NEW QUIZ DETECTED: '{i['name']}' in course {course_id}")
-                    text = Msg.new_quiz(course, i['name'], start, end)
-                    keyboard = InlineKeyboardMarkup([
-                        [InlineKeyboardButton(f"{Emoji.BRAIN} View Quiz in PPTLinks", url=quiz_url)],
-                        [InlineKeyboardButton(f"{Emoji.BOOK} View Course", url=f"https://pptlinks.com/course/{course_id}")],
-                        [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")]
-                    ])
-                    success = await self.send_message(chat_id, text, keyboard)
-                    if success:
-                        db.log_notification(chat_id, course_id, "new_quiz", f"New quiz: {i['name']}")
-                        logger.info(f"📝 New quiz notification delivered to {chat_id}: {i['name']}")
-
-    async def notify_live_classes(self, chat_id, course, old, new, course_id):
-        """Notify about live classes that just started"""
-        # Build map of old presentation statuses
-        old_statuses = {}
-        for s in old.get('CourseSection', []):
-            for i in s.get('contents', []):
-                if i['type'] in ['PPT', 'VIDEO']:
-                    old_statuses[i['id']] = i.get('presentationStatus', 'NOT_LIVE')
-
-        # Check for newly live presentations
-        live_classes_count = 0
-        for s in new.get('CourseSection', []):
-            for i in s.get('contents', []):
-                if i['type'] in ['PPT', 'VIDEO']:
-                    current_status = i.get('presentationStatus', 'NOT_LIVE')
-                    old_status = old_statuses.get(i['id'], 'NOT_LIVE')
+        """Send message to user, paced to Telegram's flood limits"""
+        for _attempt in range(2):
+            try:
+                await _send_limiter.acquire(chat_id)
+                async with _send_semaphore:
+                    message = await self.app.bot.send_message(
+                        chat_id,
+                        text,
+                        parse_mode=ParseMode.MARKDOWN,
+                        reply_markup=keyboard
+                    )
+                logger.info(f"✅ Notification delivered to {chat_id} (message_id: {message.message_id})")
+                return True
+            except RetryAfter as e:
+                # Telegram told us exactly how long to back off; honor it
+                # and retry once
+                logger.warning(f"⏳ Flood limit hit for {chat_id}, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                logger.error(f"❌ Failed to send notification to {chat_id}: {e}")
+                return False
+        logger.error(f"❌ Notification to {chat_id} dropped after flood-limit retries")
+        return False
 
-                    # If status changed to LIVE, notify
+    @staticmethod
+    def _diff_events(old_index, new):
+        """Flatten the changed payload into a list of notify events
+
+        One walk over the nested CourseSection/contents structure yields
+        ('file'|'quiz'|'live', item) pairs. The flat list is computed once
+        per content change and then fanned out to every subscriber, so the
+        per-chat work never re-traverses the payload.
+        """
+        events = []
+        for s in new.get('CourseSection', ()):
+            for i in s.get('contents', ()):
+                itype = i['type']
+                prev = old_index.get(i['id'])
+                if prev is None:
+                    if itype in FILE_TYPES:
+                        events.append(('file', i))
+                    elif itype == 'QUIZ':
+                        events.append(('quiz', i))
+                if itype in FILE_TYPES:
+                    current_status = i.get('presentationStatus', 'NOT_LIVE')
+                    old_status = prev.presentation_status if prev else 'NOT_LIVE'
                     if current_status == 'LIVE' and old_status != 'LIVE':
-                        live_classes_count += 1
-                        logger.info(f"🔴 LIVE CLASS STARTED: '{i['name']}' in course {course_id}")
-                        live_url = f"https://pptlinks.com/course/{course_id}/content/{i['id']}"
-                        text = Msg.live_class_starting(course, i['name'], live_url)
-                        keyboard = InlineKeyboardMarkup([
-                            [InlineKeyboardButton(f"{Emoji.ROCKET} Join Live Class on PPTLinks!", url=live_url)],
-                            [InlineKeyboardButton(f"{Emoji.BOOK} View Course", url=f"https://pptlinks.com/course/{course_id}")],
-                            [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")]
-                        ])
-                        success = await self.send_message(chat_id, text, keyboard)
-                        if success:
-                            db.log_notification(chat_id, course_id, "live_class_started", f"Live class started: {i['name']}")
-                            logger.info(f"🎥 Live class notification delivered to {chat_id}: {i['name']}")
-
-        if live_classes_count == 0:
-            logger.debug(f"No live classes detected for course {course_id}")
+                        events.append(('live', i))
+        return events
+
+    async def _diff_and_notify(self, chat_id, course, events, course_id):
+        """Send one subscriber the notifications for a pre-computed diff
+
+        New files/videos, new quizzes and presentations that just went LIVE
+        all arrive as events from _diff_events; the sends fire concurrently
+        since each is a full round-trip to Telegram.
+        """
+        senders = {
+            'file': self._send_new_file,
+            'quiz': self._send_new_quiz,
+            'live': self._send_live_class,
+        }
+        tasks = [senders[kind](chat_id, course, item, course_id)
+                 for kind, item in events]
+
+        if tasks:
+            # return_exceptions keeps one failed send from cancelling the
+            # rest; surface each failure in the log individually
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Notification task failed for course {course_id}: {result}")
+        else:
+            logger.debug("No new or newly live content for course %s", course_id)
+
+    async def _send_new_file(self, chat_id, course, item, course_id):
+        """Send a new PPT/video notification"""
+        # Always link to the content within the course on PPTLinks
+        content_url = CONTENT_URL(cid=course_id, iid=item['id'])
+
+        logger.info(f"🔔 NEW CONTENT DETECTED: {item['type']} '{item['name']}' in course {course_id}")
+        text = Msg.new_file(course, item['name'], content_url, item['type'])
+        keyboard = InlineKeyboardMarkup([
+            [_btn_url(f"{Emoji.ROCKET} Open in PPTLinks", content_url)],
+            *_course_footer_rows(course_id)
+        ])
+        success = await self.send_message(chat_id, text, keyboard)
+        if success:
+            db.log_notification(chat_id, course_id, "new_file", f"New {item['type']}: {item['name']}")
+            logger.info(f"📄 New {item['type']} notification delivered to {chat_id}: {item['name']}")
+
+    async def _send_new_quiz(self, chat_id, course, item, course_id):
+        """Send a new quiz notification"""
+        q = item['quiz']
+        start = format_time(q.get('startTime'))
+        end = format_time(q.get('endTime'))
+        # Link to quiz within course context
+        quiz_url = CONTENT_URL(cid=course_id, iid=item['id'])
+
+        logger.info(f"🔔 NEW QUIZ DETECTED: '{item['name']}' in course {course_id}")
+        text = Msg.new_quiz(course, item['name'], start, end)
+        keyboard = InlineKeyboardMarkup([
+            [_btn_url(f"{Emoji.BRAIN} View Quiz in PPTLinks", quiz_url)],
+            *_course_footer_rows(course_id)
+        ])
+        success = await self.send_message(chat_id, text, keyboard)
+        if success:
+            db.log_notification(chat_id, course_id, "new_quiz", f"New quiz: {item['name']}")
+            logger.info(f"📝 New quiz notification delivered to {chat_id}: {item['name']}")
+
+    async def _send_live_class(self, chat_id, course, item, course_id):
+        """Send a live-class-started notification"""
+        logger.info(f"🔴 LIVE CLASS STARTED: '{item['name']}' in course {course_id}")
+        live_url = CONTENT_URL(cid=course_id, iid=item['id'])
+        text = Msg.live_class_starting(course, item['name'], live_url)
+        keyboard = InlineKeyboardMarkup([
+            [_btn_url(f"{Emoji.ROCKET} Join Live Class on PPTLinks!", live_url)],
+            *_course_footer_rows(course_id)
+        ])
+        success = await self.send_message(chat_id, text, keyboard)
+        if success:
+            db.log_notification(chat_id, course_id, "live_class_started", f"Live class started: {item['name']}")
+            logger.info(f"🎥 Live class notification delivered to {chat_id}: {item['name']}")
 
     async def schedule(self, data, chat_id, course_id):
         """Schedule quiz reminders and course expiry"""
-        now = datetime.now(pytz.timezone('Africa/Lagos'))
-        for s in data.get('CourseSection', []):
-            for i in s.get('contents', []):
+        now = datetime.now(LAGOS_TZ)
+        # ISO-8601 date prefixes sort lexicographically, so schedule_quiz can
+        # discard long-expired quizzes with a string compare instead of a parse.
+        past_cutoff = now.date().isoformat()
+        for s in data.get('CourseSection', ()):
+            for i in s.get('contents', ()):
                 if i['type'] == 'QUIZ':
-                    await self.schedule_quiz(i, chat_id, now, course_id)
+                    await self.schedule_quiz(i, chat_id, now, course_id, past_cutoff)
 
         # Schedule course expiry notification
         await self.schedule_course_expiry(data, chat_id, now, course_id)
 
-    async def schedule_quiz(self, item, chat_id, now, course_id):
+    async def schedule_quiz(self, item, chat_id, now, course_id, past_cutoff=None):
         """Schedule start and end reminders for a quiz"""
         q = item['quiz']
         start_str = q.get('startTime')
@@ -1013,40 +1538,55 @@ class Monitor:
         qid = item['id']
         title = item['name']
 
+        # Reminders fire a day before start/end, so a quiz dated before today
+        # can never schedule anything — drop it before paying for a parse.
+        # Comparing only the date prefix keeps this safe across UTC offsets.
+        if past_cutoff:
+            if start_str and start_str[:10] < past_cutoff:
+                start_str = None
+            if end_str and end_str[:10] < past_cutoff:
+                end_str = None
+
         if start_str:
             try:
-                start = date_parser.parse(start_str)
+                start = parse_datetime(start_str)
                 if start.tzinfo is None:
-                    start = pytz.timezone('Africa/Lagos').localize(start)
+                    start = start.replace(tzinfo=LAGOS_TZ)
                 # Schedule notification 1 day before start time
                 notify_time = start - timedelta(days=1)
                 if notify_time > now:
-                    # Quiz URL within course context
-                    quiz_url = f"https://pptlinks.com/course/{course_id}/content/{qid}"
-                    scheduler.add_job(
-                        self.send_quiz_start, DateTrigger(notify_time),
-                        args=[chat_id, title, quiz_url, course_id],
-                        id=f"start_{qid}_{chat_id}", replace_existing=True
-                    )
-                    logger.info(f"Scheduled quiz notification: {title} at {notify_time} (1 day before {start}) for user {chat_id}")
+                    job_id = f"start_{qid}_{chat_id}"
+                    if Monitor._job_state.get(job_id) != notify_time:
+                        # Quiz URL within course context
+                        quiz_url = CONTENT_URL(cid=course_id, iid=qid)
+                        scheduler.add_job(
+                            self.send_quiz_start, DateTrigger(notify_time),
+                            args=[chat_id, title, quiz_url, course_id],
+                            id=job_id, replace_existing=True
+                        )
+                        Monitor._job_state[job_id] = notify_time
+                        logger.info(f"Scheduled quiz notification: {title} at {notify_time} (1 day before {start}) for user {chat_id}")
             except Exception as e:
                 logger.error(f"Error scheduling quiz start: {e}")
 
         if end_str:
             try:
-                end = date_parser.parse(end_str)
+                end = parse_datetime(end_str)
                 if end.tzinfo is None:
-                    end = pytz.timezone('Africa/Lagos').localize(end)
+                    end = end.replace(tzinfo=LAGOS_TZ)
                 remind = end - timedelta(days=1)
                 if remind > now:
-                    # Quiz URL within course context
-                    quiz_url = f"https://pptlinks.com/course/{course_id}/content/{qid}"
-                    scheduler.add_job(
-                        self.send_quiz_end, DateTrigger(remind),
-                        args=[chat_id, title, quiz_url, course_id],
-                        id=f"end_{qid}_{chat_id}", replace_existing=True
-                    )
-                    logger.info(f"Scheduled quiz end reminder: {title} at {remind} (1 day before {end}) for user {chat_id}")
+                    job_id = f"end_{qid}_{chat_id}"
+                    if Monitor._job_state.get(job_id) != remind:
+                        # Quiz URL within course context
+                        quiz_url = CONTENT_URL(cid=course_id, iid=qid)
+                        scheduler.add_job(
+                            self.send_quiz_end, DateTrigger(remind),
+                            args=[chat_id, title, quiz_url, course_id],
+                            id=job_id, replace_existing=True
+                        )
+                        Monitor._job_state[job_id] = remind
+                        logger.info(f"Scheduled quiz end reminder: {title} at {remind} (1 day before {end}) for user {chat_id}")
             except Exception as e:
                 logger.error(f"Error scheduling quiz end: {e}")
 
@@ -1055,9 +1595,8 @@ class Monitor:
         logger.info(f"📝 QUIZ STARTING SOON (1 day): '{title}' for user {chat_id}")
         text = Msg.quiz_start(title)
         keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(f"{Emoji.ROCKET} Open Quiz in PPTLinks", url=url)],
-            [InlineKeyboardButton(f"{Emoji.BOOK} View Course", url=f"https://pptlinks.com/course/{course_id}")],
-            [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")]
+            [_btn_url(f"{Emoji.ROCKET} Open Quiz in PPTLinks", url)],
+            *_course_footer_rows(course_id)
         ])
         success = await self.send_message(chat_id, text, keyboard)
         if success:
@@ -1069,9 +1608,8 @@ class Monitor:
         logger.info(f"⏰ QUIZ ENDING SOON (1 day): '{title}' for user {chat_id}")
         text = Msg.quiz_ending(title)
         keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(f"{Emoji.FIRE} Complete Quiz in PPTLinks", url=url)],
-            [InlineKeyboardButton(f"{Emoji.BOOK} View Course", url=f"https://pptlinks.com/course/{course_id}")],
-            [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")]
+            [_btn_url(f"{Emoji.FIRE} Complete Quiz in PPTLinks", url)],
+            *_course_footer_rows(course_id)
         ])
         success = await self.send_message(chat_id, text, keyboard)
         if success:
@@ -1082,32 +1620,27 @@ class Monitor:
         """Schedule course expiry notification (1 week before)"""
         try:
             # Get subscription date and course duration
-            subscription_date = db.get_subscription_date(chat_id, course_id)
+            subscription_date = await asyncio.to_thread(db.get_subscription_date, chat_id, course_id)
             if not subscription_date:
                 logger.warning(f"No subscription date found for user {chat_id}, course {course_id}")
                 return
 
             # Parse duration from course data
             duration = data.get('duration', '').upper()
-            duration_map = {
-                'ONE_MONTH': 30,
-                'TWO_MONTHS': 60,
-                'THREE_MONTHS': 90,
-                'SIX_MONTHS': 180,
-                'ONE_YEAR': 365,
-            }
-            days = duration_map.get(duration)
+            days = _DURATION_DAYS.get(duration)
             if not days:
                 logger.warning(f"Unknown duration format: {duration}")
                 return
 
-            # Calculate expiry date and notification date (1 week before)
-            sub_dt = date_parser.parse(subscription_date)
-            if sub_dt.tzinfo is None:
-                sub_dt = pytz.timezone('Africa/Lagos').localize(sub_dt)
+            # Expiry only moves on resubscribe, so the date math is cached
+            expiry_date, notify_date = _expiry_dates(subscription_date, days)
 
-            expiry_date = sub_dt + timedelta(days=days)
-            notify_date = expiry_date - timedelta(days=7)
+            # Skip the add_job round trip when the same expiry is already on
+            # the scheduler for this subscription
+            key = (chat_id, course_id)
+            if Monitor._scheduled_expiry.get(key) == expiry_date:
+                return
+            Monitor._scheduled_expiry[key] = expiry_date
 
             if notify_date > now:
                 scheduler.add_job(
@@ -1134,7 +1667,7 @@ class Monitor:
         logger.info(f"⚠️ COURSE EXPIRING (7 days): '{course_name}' for user {chat_id}")
         text = Msg.course_expiring(course_name, days_left)
         keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(f"{Emoji.BOOK} Open Course in PPTLinks", url=f"https://pptlinks.com/course/{course_id}")],
+            [InlineKeyboardButton(f"{Emoji.BOOK} Open Course in PPTLinks", url=COURSE_URL(cid=course_id))],
             [InlineKeyboardButton(f"{Emoji.CHART} My Courses", callback_data="mycourses")],
             [InlineKeyboardButton(f"{Emoji.FIRE} Main Menu", callback_data="main_menu")]
         ])
@@ -1146,37 +1679,58 @@ class Monitor:
     async def deactivate_course(self, chat_id, course_id):
         """Deactivate course subscription after expiry"""
         try:
-            db.unsubscribe_user_from_course(chat_id, course_id)
-            # Remove monitoring job
-            try:
-                scheduler.remove_job(f"poll_{chat_id}_{course_id}")
-                logger.info(f"Removed monitoring job for expired course: {chat_id}_{course_id}")
-            except Exception as e:
-                logger.warning(f"Could not remove monitoring job: {e}")
+            await asyncio.to_thread(db.unsubscribe_user_from_course, chat_id, course_id)
+            # Drop the shared poll job if that was the last subscriber
+            if not await asyncio.to_thread(db.get_course_subscribers, course_id):
+                try:
+                    scheduler.remove_job(f"poll_{course_id}")
+                    logger.info(f"Removed monitoring job for expired course: {course_id}")
+                except Exception as e:
+                    logger.warning(f"Could not remove monitoring job: {e}")
             logger.info(f"Auto-deactivated expired course for user {chat_id}: {course_id}")
 
             # Notify user
             text = f"""
 {Emoji.INFO} *Course Access Expired*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Your access to this course has ended.
 
 {Emoji.ROCKET} Want to continue learning?
 Contact support to renew your access.
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 """
             await self.send_message(chat_id, text)
         except Exception as e:
             logger.error(f"Error deactivating course: {e}")
 
 
+@functools.lru_cache(maxsize=4096)
+def parse_datetime(value: str) -> datetime:
+    """Parse an API timestamp
+
+    The PPTLinks API returns ISO-8601 strings, so take the C-implemented
+    fromisoformat fast path and only fall back to dateutil's general parser
+    for anything unusual. datetimes are immutable, so the same strings
+    coming back every poll cycle are served from cache.
+    """
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return date_parser.parse(value)
+
+
+@functools.lru_cache(maxsize=4096)
 def format_time(dt):
-    """Format datetime string to readable format"""
+    """Format datetime string to readable format
+
+    Pure string-in/string-out, and the same timestamps come back on every
+    poll of an unchanged course, so cache the rendered result.
+    """
     try:
-        return date_parser.parse(dt).strftime("%b %d, %Y • %I:%M %p")
+        return parse_datetime(dt).strftime("%b %d, %Y • %I:%M %p")
     except:
         return dt
 
@@ -1184,260 +1738,305 @@ def format_time(dt):
 # ================================
 # CALLBACK HANDLERS
 # ================================
-async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle inline keyboard button callbacks"""
-    query = update.callback_query
-    await query.answer()
-
-    chat_id = query.message.chat_id
-    data = query.data
-
-    if data == "main_menu":
-        await query.edit_message_text(
-            Msg.welcome_first_time(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.main_menu()
-        )
-
-    elif data == "add_course":
-        await query.edit_message_text(
-            Msg.add_course_instructions(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.back_to_menu()
-        )
-
-    elif data == "how_it_works":
-        await query.edit_message_text(
-            Msg.how_it_works(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.back_to_menu()
-        )
-
-    elif data == "notification_settings":
-        await query.edit_message_text(
-            f"""
+# Banner texts rendered once at import: the handlers below reuse these
+# instead of rebuilding the same multi-line f-strings on every tap. The
+# two with per-course fields are baked down to a single str.format call.
+NOTIF_SETTINGS_TEXT = f"""
 {Emoji.BELL} *Notification Settings*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Customize which notifications you want to receive.
 
 {Emoji.INFO} Toggle each notification type below:
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 {Emoji.LIGHT} _Note: Notification preferences coming soon!_
 All notifications are currently enabled.
 
-━━━━━━━━━━━━━━━━━━━━━━━
-""",
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.notification_settings_menu()
-        )
+{_HR}
+"""
 
-    elif data == "manage_courses":
-        courses = db.get_user_courses(chat_id)
-        courses_list = [(d['data'].get('name', 'Unknown') if (d := db.get_course_data(cid)) else 'Unknown', cid) for cid in courses]
+UNSUBSCRIBED_BANNER = f"""
+{Emoji.CHECK} *Unsubscribed Successfully*
 
-        # Create inline keyboard with course buttons
-        keyboard = []
-        for name, cid in courses_list:
-            keyboard.append([InlineKeyboardButton(f"{Emoji.BOOK} {name}", callback_data=f"course_detail_{cid}")])
+{_HR}
 
-        keyboard.append([InlineKeyboardButton(f"{Emoji.ROCKET} Add New Course", callback_data="add_course")])
-        keyboard.append([InlineKeyboardButton(f"{Emoji.BACK} Back to Settings", callback_data="settings")])
+You've been unsubscribed from this course.
 
-        await query.edit_message_text(
-            Msg.manage_courses(courses_list),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+{Emoji.INFO} You won't receive any more notifications for this course.
+
+{Emoji.ROCKET} Want to manage other courses?
 
-    elif data.startswith("course_detail_"):
-        course_id = data.replace("course_detail_", "")
-        course_data = db.get_course_data(course_id)
-        course_name = course_data['data'].get('name', 'Unknown Course') if course_data else 'Unknown Course'
+{_HR}
+"""
 
-        await query.edit_message_text(
-            f"""
+COURSE_DETAIL_TMPL = f"""
 {Emoji.BOOK} *Course Details*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
-*Course Name:* {course_name}
-*Course ID:* `{course_id}`
+*Course Name:* {{course_name}}
+*Course ID:* `{{course_id}}`
 
 {Emoji.BELL} *Status:* Active
 {Emoji.CLOCK} *Monitoring:* Enabled
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Choose an action below:
 
-━━━━━━━━━━━━━━━━━━━━━━━
-""",
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.course_action_menu(course_id)
-        )
-
-    elif data.startswith("unsub_course_"):
-        course_id = data.replace("unsub_course_", "")
-        course_data = db.get_course_data(course_id)
-        course_name = course_data['data'].get('name', 'Unknown Course') if course_data else 'Unknown Course'
+{_HR}
+""".format
 
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{Emoji.CHECK} Yes, Unsubscribe", callback_data=f"confirm_unsub_{course_id}"),
-                InlineKeyboardButton(f"{Emoji.BACK} Cancel", callback_data=f"course_detail_{course_id}")
-            ]
-        ]
-
-        await query.edit_message_text(
-            f"""
+UNSUB_CONFIRM_TMPL = f"""
 {Emoji.WARNING} *Confirm Unsubscribe*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+{_HR}
 
 Are you sure you want to unsubscribe from:
 
-*{course_name}*
+*{{course_name}}*
 
 {Emoji.INFO} You will stop receiving all notifications for this course.
 
 You can resubscribe anytime using:
-`/start {course_id}`
+`/start {{course_id}}`
 
-━━━━━━━━━━━━━━━━━━━━━━━
-""",
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+{_HR}
+""".format
 
-    elif data.startswith("confirm_unsub_") and not data == "confirm_unsub":
-        course_id = data.replace("confirm_unsub_", "")
 
-        # Remove monitoring job
+async def _cb_main_menu(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.welcome_first_time(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.main_menu()
+    )
+
+
+async def _cb_add_course(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.add_course_instructions(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.back_to_menu()
+    )
+
+
+async def _cb_how_it_works(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.how_it_works(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.back_to_menu()
+    )
+
+
+async def _cb_notification_settings(query, chat_id, data):
+    await query.edit_message_text(
+        NOTIF_SETTINGS_TEXT,
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.notification_settings_menu()
+    )
+
+
+async def _cb_manage_courses(query, chat_id, data):
+    courses = await asyncio.to_thread(db.get_user_courses, chat_id)
+    # One bulk name lookup instead of a round trip per course
+    names = await asyncio.to_thread(db.get_course_names_bulk, courses)
+    courses_list = [(names.get(cid) or 'Unknown', cid) for cid in courses]
+
+    # Create inline keyboard with course buttons
+    keyboard = []
+    for name, cid in courses_list:
+        keyboard.append([InlineKeyboardButton(f"{Emoji.BOOK} {name}", callback_data=f"course_detail_{cid}")])
+
+    keyboard.append([InlineKeyboardButton(f"{Emoji.ROCKET} Add New Course", callback_data="add_course")])
+    keyboard.append([InlineKeyboardButton(f"{Emoji.BACK} Back to Settings", callback_data="settings")])
+
+    await query.edit_message_text(
+        Msg.manage_courses(courses_list),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+
+async def _cb_course_detail(query, chat_id, data):
+    course_id = data.replace("course_detail_", "")
+    course_data = await asyncio.to_thread(db.get_course_data, course_id)
+    course_name = course_data['data'].get('name', 'Unknown Course') if course_data else 'Unknown Course'
+
+    await query.edit_message_text(
+        COURSE_DETAIL_TMPL(course_name=course_name, course_id=course_id),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.course_action_menu(course_id)
+    )
+
+
+async def _cb_unsub_course(query, chat_id, data):
+    course_id = data.replace("unsub_course_", "")
+    course_data = await asyncio.to_thread(db.get_course_data, course_id)
+    course_name = course_data['data'].get('name', 'Unknown Course') if course_data else 'Unknown Course'
+
+    await query.edit_message_text(
+        UNSUB_CONFIRM_TMPL(course_name=course_name, course_id=course_id),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=_unsub_confirm_menu(course_id)
+    )
+
+
+async def _cb_confirm_unsub_course(query, chat_id, data):
+    course_id = data.replace("confirm_unsub_", "")
+
+    # Unsubscribe from course, then drop the shared poll job if nobody is left
+    await asyncio.to_thread(db.unsubscribe_user_from_course, chat_id, course_id)
+    if not await asyncio.to_thread(db.get_course_subscribers, course_id):
         try:
-            scheduler.remove_job(f"poll_{chat_id}_{course_id}")
-            logger.info(f"Removed monitoring job for user {chat_id}, course {course_id}")
+            scheduler.remove_job(f"poll_{course_id}")
+            logger.info(f"Removed monitoring job for course {course_id} (no subscribers left)")
         except Exception as e:
             logger.warning(f"Could not remove job: {e}")
 
-        # Unsubscribe from course
-        db.unsubscribe_user_from_course(chat_id, course_id)
+    await query.edit_message_text(
+        UNSUBSCRIBED_BANNER,
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.main_menu()
+    )
 
-        await query.edit_message_text(
-            f"""
-{Emoji.CHECK} *Unsubscribed Successfully*
 
-━━━━━━━━━━━━━━━━━━━━━━━
+async def _cb_mycourses(query, chat_id, data):
+    courses = await asyncio.to_thread(db.get_user_courses, chat_id)
+    # One bulk name lookup instead of a round trip per course
+    names = await asyncio.to_thread(db.get_course_names_bulk, courses)
+    courses_list = [(names.get(cid) or 'Unknown', cid) for cid in courses]
 
-You've been unsubscribed from this course.
+    # Create keyboard with add course button if no courses
+    if not courses_list:
+        keyboard = [
+            [InlineKeyboardButton(f"{Emoji.ROCKET} Add Your First Course", callback_data="add_course")],
+            [InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]
+        ]
+    else:
+        keyboard = [
+            [InlineKeyboardButton(f"{Emoji.ROCKET} Add Another Course", callback_data="add_course")],
+            [InlineKeyboardButton(f"{Emoji.GEAR} Manage Courses", callback_data="manage_courses")],
+            [InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]
+        ]
 
-{Emoji.INFO} You won't receive any more notifications for this course.
+    await query.edit_message_text(
+        Msg.my_courses(courses_list),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
 
-{Emoji.ROCKET} Want to manage other courses?
 
-━━━━━━━━━━━━━━━━━━━━━━━
-""",
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.main_menu()
-        )
+async def _cb_stats(query, chat_id, data):
+    s = await asyncio.to_thread(db.get_user_stats, chat_id)
+    await query.edit_message_text(
+        Msg.stats(s['total_courses'], s['total_notifications']),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.back_to_menu()
+    )
 
-    elif data == "mycourses":
-        courses = db.get_user_courses(chat_id)
-        courses_list = [(d['data'].get('name', 'Unknown') if (d := db.get_course_data(cid)) else 'Unknown', cid) for cid in courses]
 
-        # Create keyboard with add course button if no courses
-        if not courses_list:
-            keyboard = [
-                [InlineKeyboardButton(f"{Emoji.ROCKET} Add Your First Course", callback_data="add_course")],
-                [InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]
-            ]
-        else:
-            keyboard = [
-                [InlineKeyboardButton(f"{Emoji.ROCKET} Add Another Course", callback_data="add_course")],
-                [InlineKeyboardButton(f"{Emoji.GEAR} Manage Courses", callback_data="manage_courses")],
-                [InlineKeyboardButton(f"{Emoji.BACK} Back to Menu", callback_data="main_menu")]
-            ]
-
-        await query.edit_message_text(
-            Msg.my_courses(courses_list),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+async def _cb_help(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.help_menu(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.back_to_menu()
+    )
 
-    elif data == "stats":
-        s = db.get_user_stats(chat_id)
-        await query.edit_message_text(
-            Msg.stats(s['total_courses'], s['total_notifications']),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.back_to_menu()
-        )
 
-    elif data == "help":
-        await query.edit_message_text(
-            Msg.help_menu(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.back_to_menu()
-        )
+async def _cb_settings(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.settings(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.settings_menu()
+    )
 
-    elif data == "settings":
-        await query.edit_message_text(
-            Msg.settings(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.settings_menu()
-        )
 
-    elif data == "confirm_unsub":
-        await query.edit_message_text(
-            Msg.unsubscribe_confirm(),
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=Keyboards.confirm_unsubscribe()
-        )
+async def _cb_confirm_unsub_all(query, chat_id, data):
+    await query.edit_message_text(
+        Msg.unsubscribe_confirm(),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=Keyboards.confirm_unsubscribe()
+    )
+
 
-    elif data == "do_unsub":
-        # Get all user courses and remove their monitoring jobs
-        courses = db.get_user_courses(chat_id)
-        for course_id in courses:
+async def _cb_do_unsub(query, chat_id, data):
+    # Unsubscribe from everything, then drop poll jobs for courses that
+    # lost their last subscriber
+    courses = await asyncio.to_thread(db.get_user_courses, chat_id)
+    await asyncio.to_thread(db.unsubscribe_user_from_course, chat_id)
+    for course_id in courses:
+        if not await asyncio.to_thread(db.get_course_subscribers, course_id):
             try:
-                scheduler.remove_job(f"poll_{chat_id}_{course_id}")
+                scheduler.remove_job(f"poll_{course_id}")
             except Exception as e:
-                logger.warning(f"Could not remove job poll_{chat_id}_{course_id}: {e}")
-
-        db.unsubscribe_user_from_course(chat_id)
-        await query.edit_message_text(
-            Msg.unsubscribed(),
-            parse_mode=ParseMode.MARKDOWN
-        )
-
-    elif data == "notif_status":
-        await query.answer(f"{Emoji.BELL} Notifications are active!", show_alert=True)
-
-    elif data == "toggle_content_notif":
-        await query.answer(f"{Emoji.INFO} Content notifications are always ON", show_alert=True)
-
-    elif data == "toggle_quiz_notif":
-        await query.answer(f"{Emoji.INFO} Quiz reminders are always ON", show_alert=True)
+                logger.warning(f"Could not remove job poll_{course_id}: {e}")
+    await query.edit_message_text(
+        Msg.unsubscribed(),
+        parse_mode=ParseMode.MARKDOWN
+    )
 
-    elif data == "toggle_live_notif":
-        await query.answer(f"{Emoji.INFO} Live class alerts are always ON", show_alert=True)
 
-    elif data == "toggle_expiry_notif":
-        await query.answer(f"{Emoji.INFO} Expiry warnings are always ON", show_alert=True)
+def _cb_alert(text):
+    """Handler factory for buttons that just pop an alert"""
+    async def _handler(query, chat_id, data):
+        await query.answer(text, show_alert=True)
+    return _handler
+
+
+# O(1) dispatch for exact callback values; checked before the prefix list,
+# so exact keys shadow any prefix they share
+_CALLBACKS = {
+    "main_menu": _cb_main_menu,
+    "add_course": _cb_add_course,
+    "how_it_works": _cb_how_it_works,
+    "notification_settings": _cb_notification_settings,
+    "manage_courses": _cb_manage_courses,
+    "mycourses": _cb_mycourses,
+    "stats": _cb_stats,
+    "help": _cb_help,
+    "settings": _cb_settings,
+    "confirm_unsub": _cb_confirm_unsub_all,
+    "do_unsub": _cb_do_unsub,
+    "notif_status": _cb_alert(f"{Emoji.BELL} Notifications are active!"),
+    "toggle_content_notif": _cb_alert(f"{Emoji.INFO} Content notifications are always ON"),
+    "toggle_quiz_notif": _cb_alert(f"{Emoji.INFO} Quiz reminders are always ON"),
+    "toggle_live_notif": _cb_alert(f"{Emoji.INFO} Live class alerts are always ON"),
+    "toggle_expiry_notif": _cb_alert(f"{Emoji.INFO} Expiry warnings are always ON"),
+    "snooze_quiz": _cb_alert(f"{Emoji.CLOCK} Reminder snoozed for 30 minutes"),
+    "quiz_now": _cb_alert(f"{Emoji.FIRE} Good luck on your quiz!"),
+}
+
+# Callback families carrying a course/quiz id suffix
+_PREFIX_CALLBACKS = (
+    ("course_detail_", _cb_course_detail),
+    ("unsub_course_", _cb_unsub_course),
+    ("confirm_unsub_", _cb_confirm_unsub_course),
+    ("course_notif_", _cb_alert(f"{Emoji.BELL} Notifications are active for this course!")),
+    ("remind_", _cb_alert(f"{Emoji.CHECK} You'll be reminded when the quiz starts!")),
+)
 
-    elif data.startswith("course_notif_"):
-        course_id = data.replace("course_notif_", "")
-        await query.answer(f"{Emoji.BELL} Notifications are active for this course!", show_alert=True)
 
-    elif data.startswith("remind_"):
-        await query.answer(f"{Emoji.CHECK} You'll be reminded when the quiz starts!", show_alert=True)
+async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle inline keyboard button callbacks via dict dispatch"""
+    query = update.callback_query
+    await query.answer()
 
-    elif data == "snooze_quiz":
-        await query.answer(f"{Emoji.CLOCK} Reminder snoozed for 30 minutes", show_alert=True)
+    chat_id = query.message.chat_id
+    data = query.data
 
-    elif data == "quiz_now":
-        await query.answer(f"{Emoji.FIRE} Good luck on your quiz!", show_alert=True)
+    handler = _CALLBACKS.get(data)
+    if handler is None:
+        for prefix, prefix_handler in _PREFIX_CALLBACKS:
+            if data.startswith(prefix):
+                handler = prefix_handler
+                break
+        else:
+            return
+    await handler(query, chat_id, data)
 
 
 # ================================
@@ -1451,11 +2050,11 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     chat_id = update.effective_chat.id
     user = update.effective_user
-    db.add_user(chat_id, user.username, user.first_name, user.last_name)
+    await asyncio.to_thread(db.add_user, chat_id, user.username, user.first_name, user.last_name)
 
-    # Check if this is first time user (no courses)
-    existing_courses = db.get_user_courses(chat_id)
-    is_first_time = len(existing_courses) == 0
+    # Check if this is first time user (no courses) - existence probe only,
+    # no need to materialize the full course list
+    is_first_time = not await asyncio.to_thread(db.user_has_any_course, chat_id)
 
     # Course ID MUST be provided from deep link
     if not context.args or len(context.args) == 0:
@@ -1485,20 +2084,25 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode=ParseMode.MARKDOWN
     )
 
-    if db.subscribe_user_to_course(chat_id, course_id):
+    if await asyncio.to_thread(db.subscribe_user_to_course, chat_id, course_id):
         logger.info(f"User {chat_id} attempting to subscribe to course {course_id}")
-        data = PPTLinksAPI.fetch_course_data(course_id)
+        data = await PPTLinksAPI.fetch_course_data_async(course_id)
         if data:
-            monitor = Monitor(context.application)
+            # Monitor holds no per-user state - share one instance app-wide
+            monitor = context.bot_data.setdefault('monitor', Monitor(context.application))
             await monitor.check(chat_id, course_id)
-            scheduler.add_job(
-                monitor.check, 'interval', seconds=POLL_INTERVAL,
-                args=[chat_id, course_id], id=f"poll_{chat_id}_{course_id}", replace_existing=True
-            )
+            # One poll job per course, shared by all of its subscribers
+            _add_poll_job(monitor, course_id)
             logger.info(f"User {chat_id} subscribed successfully to {course_id} - monitoring started")
 
-            # Delete loading message
-            await loading_msg.delete()
+            # Edit the loading message into the confirmation instead of
+            # deleting it - deleteMessage is the flakier call under flood
+            # control, and the edit doubles as the success summary
+            await loading_msg.edit_text(
+                Msg.subscribed(data.get('name', 'Course'), course_id),
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=Keyboards.main_menu()
+            )
         else:
             await loading_msg.edit_text(
                 Msg.api_error(),
@@ -1516,8 +2120,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def mycourses(update: Update, context):
     """Handle /mycourses command"""
     chat_id = update.effective_chat.id
-    courses = db.get_user_courses(chat_id)
-    courses_list = [(d['data'].get('name', 'Unknown') if (d := db.get_course_data(cid)) else 'Unknown', cid) for cid in courses]
+    courses = await asyncio.to_thread(db.get_user_courses, chat_id)
+    # One bulk name lookup instead of a round trip per course
+    names = await asyncio.to_thread(db.get_course_names_bulk, courses)
+    courses_list = [(names.get(cid) or 'Unknown', cid) for cid in courses]
 
     # Create keyboard with add course button if no courses
     if not courses_list:
@@ -1543,23 +2149,24 @@ async def unsubscribe(update: Update, context):
     """Handle /unsubscribe command - unsubscribes from all courses"""
     chat_id = update.effective_chat.id
 
-    # Get all user courses and remove their monitoring jobs
-    courses = db.get_user_courses(chat_id)
+    # Unsubscribe from everything, then drop poll jobs for courses that
+    # lost their last subscriber
+    courses = await asyncio.to_thread(db.get_user_courses, chat_id)
+    await asyncio.to_thread(db.unsubscribe_user_from_course, chat_id)
     for course_id in courses:
-        try:
-            scheduler.remove_job(f"poll_{chat_id}_{course_id}")
-            logger.info(f"Removed monitoring job for user {chat_id}, course {course_id}")
-        except Exception as e:
-            logger.warning(f"Could not remove job poll_{chat_id}_{course_id}: {e}")
-
-    db.unsubscribe_user_from_course(chat_id)
+        if not await asyncio.to_thread(db.get_course_subscribers, course_id):
+            try:
+                scheduler.remove_job(f"poll_{course_id}")
+                logger.info(f"Removed monitoring job for course {course_id}")
+            except Exception as e:
+                logger.warning(f"Could not remove job poll_{course_id}: {e}")
     await update.message.reply_text(Msg.unsubscribed(), parse_mode=ParseMode.MARKDOWN)
     logger.info(f"User {chat_id} unsubscribed from all courses")
 
 
 async def stats_cmd(update: Update, context):
     """Handle /stats command"""
-    s = db.get_user_stats(update.effective_chat.id)
+    s = await asyncio.to_thread(db.get_user_stats, update.effective_chat.id)
     await update.message.reply_text(
         Msg.stats(s['total_courses'], s['total_notifications']),
         parse_mode=ParseMode.MARKDOWN,
@@ -1590,34 +2197,57 @@ async def settings_cmd(update: Update, context):
 # ================================
 async def post_init(application):
     """Initialize scheduler after event loop starts"""
+    # Every DB call goes through asyncio.to_thread; size the default
+    # executor so concurrent polls don't queue behind its small default
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=32, thread_name_prefix='worker')
+    )
     scheduler.start()
     logger.info(f"{Emoji.CHECK} Scheduler started")
 
-    # Restore monitoring for existing users with their courses
-    monitor = Monitor(application)
-    subscriptions = db.get_all_active_subscriptions()
-    restored = 0
-    for chat_id, course_id in subscriptions:
-        # Restore interval polling job
-        scheduler.add_job(
-            monitor.check, 'interval', seconds=POLL_INTERVAL,
-            args=[chat_id, course_id], id=f"poll_{chat_id}_{course_id}", replace_existing=True
-        )
+    # Restore monitoring for existing users with their courses.
+    # One JOIN fetches subscriptions and cached course data together so the
+    # restore loop never goes back to the DB per user.
+    monitor = application.bot_data.setdefault('monitor', Monitor(application))
+    subscriptions = await asyncio.to_thread(db.get_all_active_subscriptions_with_data)
 
-        # Restore scheduled reminders by fetching course data and rescheduling
-        try:
-            course_data_obj = db.get_course_data(course_id)
-            if course_data_obj and course_data_obj.get('data'):
-                await monitor.schedule(course_data_obj['data'], chat_id, course_id)
-                logger.info(f"Restored reminders for user {chat_id}, course {course_id}")
-        except Exception as e:
-            logger.error(f"Error restoring reminders for {chat_id}/{course_id}: {e}")
+    # Restore subscriptions concurrently (bounded) so thousands of them
+    # don't serialize the warm-up behind one DB read at a time
+    sem = asyncio.Semaphore(32)
 
-        restored += 1
-        logger.info(f"Restored monitoring for user {chat_id}, course {course_id}")
+    async def restore_one(chat_id, course_id, course_data):
+        async with sem:
+            # Restore the shared per-course polling job (replace_existing
+            # makes repeats across subscribers a no-op)
+            _add_poll_job(monitor, course_id)
 
-    if restored > 0:
-        logger.info(f"{Emoji.CHECK} Restored monitoring for {restored} user-course subscriptions")
+            # Restore scheduled reminders from the cached course data
+            try:
+                if course_data:
+                    await monitor.schedule(course_data, chat_id, course_id)
+                    logger.info(f"Restored reminders for user {chat_id}, course {course_id}")
+            except Exception as e:
+                logger.error(f"Error restoring reminders for {chat_id}/{course_id}: {e}")
+            logger.info(f"Restored monitoring for user {chat_id}, course {course_id}")
+
+    results = await asyncio.gather(
+        *(restore_one(c, cid, d) for c, cid, d in subscriptions),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error restoring subscription: {result}")
+
+    if subscriptions:
+        logger.info(f"{Emoji.CHECK} Restored monitoring for {len(subscriptions)} user-course subscriptions")
+
+
+async def post_shutdown(application):
+    """Clean up resources when the bot stops"""
+    if _async_client is not None:
+        await _async_client.aclose()
+    db.close()
+    logger.info(f"{Emoji.CHECK} Database connection closed")
 
 
 # ================================
@@ -1625,8 +2255,12 @@ async def post_init(application):
 # ================================
 def main():
     """Main function to start the bot"""
+    if uvloop is not None:
+        uvloop.install()
+        logger.info("uvloop installed as event loop policy")
+
     if not BOT_TOKEN:
-        logger.error("NO BOT TOKEN")
+        logger.error("BOT_TOKEN environment variable not set")
         return
 
     logger.info("=" * 50)
@@ -1636,8 +2270,11 @@ def main():
     logger.info(f"{Emoji.CLOCK} Check Interval: {POLL_INTERVAL}s")
     logger.info("=" * 50)
 
-    request = HTTPXRequest(connect_timeout=30, read_timeout=30)
-    app = Application.builder().token(BOT_TOKEN).request(request).post_init(post_init).build()
+    # PTB's pool (256 connections by default) lets sends overlap; the tighter
+    # timeouts keep one stalled call from tying up a slot for half a minute
+    request = HTTPXRequest(connect_timeout=10, read_timeout=20,
+                           write_timeout=20, pool_timeout=5)
+    app = Application.builder().token(BOT_TOKEN).request(request).post_init(post_init).post_shutdown(post_shutdown).build()
 
     # Add command handlers
     app.add_handler(CommandHandler("start", start))
@@ -1653,7 +2290,21 @@ def main():
     logger.info(f"{Emoji.FIRE} Bot is now live and ready!")
     logger.info("=" * 50)
 
-    app.run_polling(drop_pending_updates=True)
+    # Webhook mode (push delivery, no getUpdates long-poll loop) when a
+    # public URL is configured; needs the python-telegram-bot[webhooks]
+    # extra and TLS termination in front. Polling remains the default.
+    webhook_url = os.environ.get("WEBHOOK_URL", "")
+    if webhook_url:
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=int(os.environ.get("WEBHOOK_PORT", "8443")),
+            url_path=BOT_TOKEN,
+            webhook_url=f"{webhook_url.rstrip('/')}/{BOT_TOKEN}",
+            secret_token=os.environ.get("WEBHOOK_SECRET") or None,
+            drop_pending_updates=True,
+        )
+    else:
+        app.run_polling(drop_pending_updates=True)
 
 
 if __name__ == "__main__":
@@ -27,7 +27,7 @@ def test_env():
 def test_telegram():
     print("\n" + "="*50 + "\nTesting Telegram Bot\n" + "="*50)
     try:
-        r = requests.get(f"https://api.telegram.org/bot8126336145:AAH9ROvECWEA1Bo1J_xclwrYA0lYdhWiMNA/getMe", timeout=10)
+        r = requests.get(f"https://api.telegram.org/bot{os.environ.get('BOT_TOKEN', '')}/getMe", timeout=10)
         if r.status_code == 200 and r.json().get('ok'):
             bot = r.json()['result']
             ok("Bot is alive!")
@@ -56,7 +56,7 @@ def test_api():
 
 def test_deps():
     print("\n" + "="*50 + "\nTesting Dependencies\n" + "="*50)
-    for pkg in ['telegram', 'requests', 'apscheduler', 'pytz', 'dateutil']:
+    for pkg in ['telegram', 'requests', 'apscheduler', 'dateutil']:
         try:
             __import__(pkg.replace('-', '_') if pkg == 'dateutil' else pkg)
             ok(f"{pkg} installed")
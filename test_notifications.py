@@ -7,50 +7,37 @@ This script tests all notification scenarios to ensure production readiness.
 
 import sys
 import hashlib
-import json
 from datetime import datetime, timedelta
 import pytz
 
-# Replicate the hash function from main.py (to avoid importing telegram)
-def get_content_hash(data):
-    """Generate hash based only on actual content, not dynamic fields"""
-    content_data = {
-        'course_id': data.get('id'),
-        'sections': []
-    }
-
+# Replicate the fingerprint hash from main.py (to avoid importing telegram)
+def content_index(data):
+    """Flatten the payload into {content_id: fingerprint}"""
+    index = {}
     for section in data.get('CourseSection', []):
-        section_content = {
-            'id': section.get('id'),
-            'title': section.get('title'),
-            'contents': []
-        }
-
         for item in section.get('contents', []):
-            item_content = {
-                'id': item.get('id'),
-                'name': item.get('name'),
-                'type': item.get('type'),
-                'status': item.get('status'),
-                'presentationStatus': item.get('presentationStatus'),
-            }
-
-            if item.get('type') == 'QUIZ' and 'quiz' in item:
-                item_content['quiz'] = {
-                    'status': item['quiz'].get('status'),
-                    'startTime': item['quiz'].get('startTime'),
-                    'endTime': item['quiz'].get('endTime'),
-                    'duration': item['quiz'].get('duration')
-                }
-
-            if 'file' in item:
-                item_content['file'] = item.get('file')
+            quiz = item.get('quiz')
+            index[item['id']] = (
+                item.get('name'),
+                item.get('type'),
+                item.get('status'),
+                item.get('presentationStatus'),
+                quiz.get('status') if quiz else None,
+                quiz.get('startTime') if quiz else None,
+                quiz.get('endTime') if quiz else None,
+                quiz.get('duration') if quiz else None,
+                repr(item.get('file')),
+            )
+    return index
 
-            section_content['contents'].append(item_content)
 
-        content_data['sections'].append(section_content)
-
-    return hashlib.md5(json.dumps(content_data, sort_keys=True).encode()).hexdigest()
+def get_content_hash(data):
+    """Hash the semantic content fingerprint of a course payload"""
+    index = content_index(data)
+    h = hashlib.blake2b(digest_size=16)
+    for item in sorted(index.items()):
+        h.update(repr(item).encode())
+    return h.hexdigest()
 
 class PPTLinksAPI:
     @staticmethod